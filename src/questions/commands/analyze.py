@@ -1,8 +1,16 @@
 import click
 from pathlib import Path
+from questions.core.cache import FileCache
+from questions.core.parser import PARSE_CACHE_VERSION
 from questions.core.validator import GiftAnalyzer
 
-from questions.commands.common import llm_option
+from questions.commands.common import llm_option, jobs_option
+
+cache_option = click.option('--cache', 'use_cache', is_flag=True,
+                            help='Reusar el parseo de archivos sin cambios desde la última ejecución.')
+
+def _parse_cache(use_cache: bool):
+    return FileCache("gift-parse", version=PARSE_CACHE_VERSION) if use_cache else None
 
 @click.group()
 @llm_option
@@ -14,12 +22,14 @@ def analyze():
 @click.argument('paths', nargs=-1, type=click.Path(exists=True))
 @click.option('-r', '--recursive', is_flag=True, help='Buscar recursivamente')
 @click.option('-o', '--output', help='Archivo de salida para el informe')
-def stats(paths, recursive, output):
+@cache_option
+@jobs_option
+def stats(paths, recursive, output, use_cache, jobs):
     """Genera estadísticas de un directorio de preguntas."""
     if not paths:
         paths = ['.']
         
-    analyzer = GiftAnalyzer(recursive=recursive)
+    analyzer = GiftAnalyzer(recursive=recursive, jobs=jobs, cache=_parse_cache(use_cache))
     for p in paths:
         path_obj = Path(p)
         if path_obj.is_dir():
@@ -36,12 +46,19 @@ def stats(paths, recursive, output):
 @click.argument('paths', nargs=-1, type=click.Path(exists=True))
 @click.option('-r', '--recursive', is_flag=True, help='Buscar recursivamente')
 @click.option('-s', '--similarity', type=float, default=0.85, help='Threshold de similitud')
-def similar(paths, recursive, similarity):
+@click.option('--min-df', type=int, default=1, show_default=True,
+              help='Ignorar en TF-IDF palabras presentes en menos de N preguntas')
+@click.option('--max-df', type=float, default=1.0, show_default=True,
+              help='Ignorar en TF-IDF palabras presentes en más de esta fracción de preguntas')
+@cache_option
+@jobs_option
+def similar(paths, recursive, similarity, min_df, max_df, use_cache, jobs):
     """Encuentra preguntas similares en un directorio."""
     if not paths:
         paths = ['.']
         
-    analyzer = GiftAnalyzer(similarity_threshold=similarity, recursive=recursive)
+    analyzer = GiftAnalyzer(similarity_threshold=similarity, recursive=recursive, jobs=jobs,
+                            cache=_parse_cache(use_cache), min_df=min_df, max_df=max_df)
     for p in paths:
         path_obj = Path(p)
         if path_obj.is_dir():
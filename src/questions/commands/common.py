@@ -11,3 +11,33 @@ def llm_option(f):
     return click.option('--llm', is_flag=True, callback=llm_callback, 
                         expose_value=False, is_eager=True,
                         help='Muestra instrucciones para un LLM sobre este comando.')(f)
+
+def jobs_option(f):
+    return click.option('--jobs', type=click.IntRange(min=1), default=None,
+                        help='Procesos en paralelo (default: núcleos disponibles; 1 = secuencial).')(f)
+
+class EchoBuffer:
+    """
+    Acumula las líneas de progreso y las emite en bloques, en lugar de
+    escribir (y forzar un flush de la terminal) una vez por archivo.
+    """
+
+    def __init__(self, every: int = 50):
+        self.every = every
+        self._lines = []
+
+    def echo(self, line: str):
+        self._lines.append(line)
+        if len(self._lines) >= self.every:
+            self.flush()
+
+    def flush(self):
+        if self._lines:
+            click.echo("\n".join(self._lines))
+            self._lines.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
@@ -1,8 +1,8 @@
 import click
-from pathlib import Path
-from questions.core.converter import convert_html_tags_to_markdown
+from questions.core.converter import convert_html_file_to_markdown
+from questions.core.files import map_files, collect_files
 
-from questions.commands.common import llm_option
+from questions.commands.common import llm_option, jobs_option, EchoBuffer
 
 @click.group()
 @llm_option
@@ -13,41 +13,22 @@ def convert():
 @convert.command(name="html-to-md")
 @click.argument('paths', nargs=-1, type=click.Path(exists=True))
 @click.option('-r', '--recursive', is_flag=True, help='Procesar recursivamente')
-def html_to_md(paths, recursive):
+@jobs_option
+def html_to_md(paths, recursive, jobs):
     """Convierte tags HTML a Markdown en archivos XML o GIFT."""
     if not paths:
         paths = ['.']
     
-    files = []
-    for p in paths:
-        path = Path(p)
-        if path.is_file():
-            files.append(path)
-        elif path.is_dir():
-            pattern = "**/*" if recursive else "*"
-            files.extend([f for f in path.glob(pattern) if f.suffix in ('.xml', '.gift', '.md')])
+    files = collect_files(paths, ('.xml', '.gift', '.md'), recursive)
 
     modified_count = 0
-    for f in files:
-        try:
-            content = f.read_text(encoding='utf-8')
-            # Si es XML, procesar dentro de CDATA
-            if f.suffix == '.xml':
-                def replace_cdata(match):
-                    return f"<![CDATA[{convert_html_tags_to_markdown(match.group(1))}]]>"
-                import re
-                modified = re.sub(r'<!\[CDATA\[(.*?)\]\]>', replace_cdata, content, flags=re.DOTALL)
-                # También cambiar format="html" a format="markdown"
-                modified = modified.replace('format="html"', 'format="markdown"')
-            else:
-                modified = convert_html_tags_to_markdown(content)
-            
-            if content != modified:
-                f.write_text(modified, encoding='utf-8')
-                click.echo(f"✓ {f}")
+    with EchoBuffer() as out:
+        for f, modified, error in map_files(convert_html_file_to_markdown, files, jobs=jobs):
+            if error:
+                click.echo(f"Error en {f}: {error}", err=True)
+            elif modified:
+                out.echo(f"✓ {f}")
                 modified_count += 1
-        except Exception as e:
-            click.echo(f"Error en {f}: {e}", err=True)
     
     click.echo(f"\nFinalizado: {modified_count} archivos modificados.")
 
@@ -1,9 +1,12 @@
+import sys
 import click
 from pathlib import Path
-from questions.core.formatter import fix_code_indentation, convert_markdown_code_blocks, process_xml_cdata
+from questions.core.formatter import fix_code_indentation, convert_code_chars_in_file, CODE_CHARS_CACHE_VERSION
 from questions.core.naming import rename_to_slug, rename_from_title, set_question_title
+from questions.core.files import map_files, collect_files
+from questions.core.cache import FileCache
 
-from questions.commands.common import llm_option
+from questions.commands.common import llm_option, jobs_option
 
 @click.group()
 @llm_option
@@ -123,34 +126,59 @@ def code_indent(paths, recursive):
 @click.option('-r', '--recursive', is_flag=True, help='Procesar recursivamente')
 @click.option('--to-normal', is_flag=True, default=True, help='Convertir a normal (default)')
 @click.option('--to-fullwidth', is_flag=True, help='Convertir a fullwidth')
-def code_chars(paths, recursive, to_normal, to_fullwidth):
+@click.option('--cache', 'use_cache', is_flag=True,
+              help='Omitir archivos sin cambios desde la última ejecución.')
+@click.option('--server', is_flag=True,
+              help='Leer rutas desde stdin y procesarlas sin reiniciar (para hooks de editores). '
+                   'No admite PATHS, --cache ni --jobs.')
+@jobs_option
+def code_chars(paths, recursive, to_normal, to_fullwidth, use_cache, server, jobs):
     """Corrige caracteres especiales en bloques de código."""
     if to_fullwidth:
         to_normal = False
+
+    if server:
+        # Las rutas llegan por stdin, de a una: PATHS, --cache y --jobs no aplican
+        if paths or use_cache or jobs is not None:
+            raise click.UsageError("--server no admite PATHS, --cache ni --jobs.")
+        # Una línea de respuesta por ruta; tablas, regex y memoización
+        # quedan calientes entre pedidos.
+        for line in sys.stdin:
+            path = line.strip()
+            if not path:
+                continue
+            try:
+                count = convert_code_chars_in_file(Path(path), to_normal)
+                click.echo(f"OK {count}")
+            except Exception as e:
+                click.echo(f"ERROR {e}")
+            sys.stdout.flush()
+        return
         
     if not paths:
         paths = ['.']
     
-    files = []
-    for p in paths:
-        path = Path(p)
-        if path.is_file():
-            files.append(path)
-        elif path.is_dir():
-            pattern = "**/*" if recursive else "*"
-            files.extend([f for f in path.glob(pattern) if f.suffix in ('.gift', '.md', '.xml')])
+    files = collect_files(paths, ('.gift', '.md', '.xml'), recursive)
+
+    cache = None
+    if use_cache:
+        cache = FileCache("code-chars-normal" if to_normal else "code-chars-fullwidth",
+                          version=CODE_CHARS_CACHE_VERSION)
+        files = [f for f in files if not cache.get(f)]
 
     modified_count = 0
-    for f in files:
-        content = f.read_text(encoding='utf-8')
-        if f.suffix == '.xml':
-            new_content, count = process_xml_cdata(content, to_normal)
-        else:
-            new_content, count = convert_markdown_code_blocks(content, to_normal)
-            
+    for f, count, error in map_files(convert_code_chars_in_file, files, to_normal, jobs=jobs):
+        if error:
+            click.echo(f"Error en {f}: {error}", err=True)
+            continue
         if count > 0:
-            f.write_text(new_content, encoding='utf-8')
             click.echo(f"✓ {f}: {count} bloques corregidos")
             modified_count += 1
+        if cache:
+            # Tras la conversión el archivo ya está en la forma pedida
+            cache.set(f, True)
+
+    if cache:
+        cache.save()
     
     click.echo(f"\nFinalizado: {modified_count} archivos modificados.")
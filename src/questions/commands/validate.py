@@ -3,7 +3,7 @@ from pathlib import Path
 from questions.core.validator import GiftAnalyzer
 from questions.core.parser import parse_gift_file
 
-from questions.commands.common import llm_option
+from questions.commands.common import llm_option, jobs_option
 
 @click.command()
 @llm_option
@@ -13,7 +13,8 @@ from questions.commands.common import llm_option
 @click.option('-v', '--verbose', is_flag=True, help='Información detallada')
 @click.option('-s', '--similarity', type=float, default=0.85, help='Threshold para duplicados')
 @click.option('-j', '--json', 'output_json', is_flag=True, help='Salida en JSON')
-def validate(paths, output, recursive, verbose, similarity, output_json):
+@jobs_option
+def validate(paths, output, recursive, verbose, similarity, output_json, jobs):
     """Valida archivos o directorios de preguntas GIFT."""
     if not paths:
         paths = ['.']
@@ -22,7 +23,8 @@ def validate(paths, output, recursive, verbose, similarity, output_json):
     analyzer = GiftAnalyzer(
         similarity_threshold=similarity,
         recursive=recursive,
-        verbose=verbose
+        verbose=verbose,
+        jobs=jobs
     )
     
     files_to_validate = []
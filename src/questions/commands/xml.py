@@ -1,9 +1,24 @@
+import os
 import click
-import xml.etree.ElementTree as ET
-from pathlib import Path
-from questions.core.xml_tools import ensure_cdata_in_text_blocks, sanitize_filename, remove_tags_from_xml
+from collections import Counter
+from questions.core.cache import FileCache
+from questions.core.xml_tools import (
+    CLEAN_TAGS_CACHE_VERSION, QUESTION_NAME_CACHE_VERSION,
+    ensure_cdata_in_file, question_file_name, remove_tags_from_file, unique_file_name,
+)
+from questions.core.files import map_files, iter_paths
 
-from questions.commands.common import llm_option
+from questions.commands.common import llm_option, jobs_option, EchoBuffer
+
+cache_option = click.option('--cache', 'use_cache', is_flag=True,
+                            help='Omitir archivos sin cambios desde la última ejecución.')
+
+def _iter_xml_files(paths, recursive):
+    # Las rutas a archivos que no son .xml se ignoran, igual que en directorios
+    return (f for f in iter_paths(paths, ('.xml',), recursive) if f.suffix.lower() == '.xml')
+
+def _collect_xml_files(paths, recursive):
+    return list(_iter_xml_files(paths, recursive))
 
 @click.group()
 @llm_option
@@ -14,84 +29,126 @@ def xml():
 @xml.command()
 @click.argument('paths', nargs=-1, type=click.Path(exists=True))
 @click.option('-r', '--recursive', is_flag=True, help='Procesar recursivamente')
-def cdata(paths, recursive):
+@click.option('--dry-run', is_flag=True, help='Solo informar, sin modificar archivos')
+@jobs_option
+def cdata(paths, recursive, dry_run, jobs):
     """Asegura que los bloques <text> usen CDATA."""
     if not paths:
         paths = ['.']
     
-    files = []
-    for p in paths:
-        path = Path(p)
-        if path.is_file() and path.suffix == '.xml':
-            files.append(path)
-        elif path.is_dir():
-            pattern = "**/*.xml" if recursive else "*.xml"
-            files.extend(list(path.glob(pattern)))
-
-    for f in files:
-        content = f.read_text(encoding='utf-8')
-        new_content, count = ensure_cdata_in_text_blocks(content)
-        if count > 0:
-            f.write_text(new_content, encoding='utf-8')
-            click.echo(f"✓ {f}: {count} bloques actualizados")
+    files = _collect_xml_files(paths, recursive)
+
+    with EchoBuffer() as out:
+        for f, count, error in map_files(ensure_cdata_in_file, files, dry_run, jobs=jobs):
+            if error:
+                click.echo(f"Error en {f}: {error}", err=True)
+            elif count > 0 and dry_run:
+                out.echo(f"○ {f}: {count} bloques sin CDATA")
+            elif count > 0:
+                out.echo(f"✓ {f}: {count} bloques actualizados")
 
 @xml.command()
 @click.argument('paths', nargs=-1, type=click.Path(exists=True))
 @click.option('-r', '--recursive', is_flag=True, help='Procesar recursivamente')
-def clean_tags(paths, recursive):
+@click.option('--dry-run', is_flag=True, help='Solo informar, sin modificar archivos')
+@cache_option
+@jobs_option
+def clean_tags(paths, recursive, dry_run, use_cache, jobs):
     """Elimina tags de las preguntas XML."""
     if not paths:
         paths = ['.']
     
-    files = []
-    for p in paths:
-        path = Path(p)
-        if path.is_file() and path.suffix == '.xml':
-            files.append(path)
-        elif path.is_dir():
-            pattern = "**/*.xml" if recursive else "*.xml"
-            files.extend(list(path.glob(pattern)))
-
-    for f in files:
-        try:
-            tree = ET.parse(f)
-            root = tree.getroot()
-            count = remove_tags_from_xml(root)
+    # Los archivos se recorren a medida que se procesan, sin armar la lista
+    files = _iter_xml_files(paths, recursive)
+
+    # La caché guarda los archivos que ya no tienen tags
+    cache = None
+    if use_cache:
+        cache = FileCache("xml-clean-tags", version=CLEAN_TAGS_CACHE_VERSION)
+        files = (f for f in files if not cache.get(f))
+
+    # Cada archivo se parsea y reescribe por separado: se reparten entre procesos
+    total = modified = errors = 0
+    with EchoBuffer() as out:
+        for f, count, error in map_files(remove_tags_from_file, files, dry_run, jobs=jobs):
+            if error:
+                errors += 1
+                click.echo(f"Error en {f}: {error}", err=True)
+                continue
+            total += 1
+            if count > 0 and dry_run:
+                out.echo(f"○ {f}: {count} preguntas con tags")
+            elif count > 0:
+                out.echo(f"✓ {f}: {count} tags eliminados")
             if count > 0:
-                tree.write(f, encoding='utf-8', xml_declaration=True)
-                click.echo(f"✓ {f}: {count} tags eliminados")
-        except Exception as e:
-            click.echo(f"Error en {f}: {e}", err=True)
+                modified += 1
+            if cache and (count == 0 or not dry_run):
+                cache.set(f, True)
+
+    if cache:
+        cache.save()
+
+    click.echo(f"\nFinalizado: {total} archivos revisados, {modified} con tags, {errors} con errores.")
 
 @xml.command()
 @click.argument('paths', nargs=-1, type=click.Path(exists=True))
 @click.option('-r', '--recursive', is_flag=True, help='Procesar recursivamente')
-def rename(paths, recursive):
+@cache_option
+@jobs_option
+def rename(paths, recursive, use_cache, jobs):
     """Renombra archivos XML según el nombre de la pregunta."""
     if not paths:
         paths = ['.']
         
-    files = []
-    for p in paths:
-        path = Path(p)
-        if path.is_file() and path.suffix == '.xml':
-            files.append(path)
-        elif path.is_dir():
-            pattern = "**/*.xml" if recursive else "*.xml"
-            files.extend(list(path.glob(pattern)))
-
-    for f in sorted(files):
-        try:
-            tree = ET.parse(f)
-            root = tree.getroot()
-            question = root.find('.//question')
-            if question is not None:
-                name_elem = question.find('.//name/text')
-                if name_elem is not None and name_elem.text:
-                    new_name = sanitize_filename(name_elem.text) + ".xml"
-                    new_path = f.parent / new_name
-                    if f != new_path:
-                        f.rename(new_path)
-                        click.echo(f"✓ {f} -> {new_path}")
-        except Exception as e:
-            click.echo(f"Error en {f}: {e}", err=True)
+    files = sorted(_collect_xml_files(paths, recursive))
+
+    # Fase 1: el nombre de cada archivo, de la caché ("" si no tiene) o
+    # leído en paralelo, que es lo costoso.
+    cache = FileCache("xml-question-names", version=QUESTION_NAME_CACHE_VERSION) if use_cache else None
+    names = [cache.get(f) for f in files] if cache else [None] * len(files)
+    pending = [i for i, name in enumerate(names) if name is None]
+    results = map_files(question_file_name, [files[i] for i in pending], jobs=jobs)
+    for i, (f, name, error) in zip(pending, results):
+        if error:
+            click.echo(f"Error en {f}: {error}", err=True)
+            continue
+        names[i] = name or ""
+        if cache:
+            cache.set(f, names[i])
+
+    # Fase 2: destinos sin colisiones, resueltos en memoria. Cada directorio
+    # se lista una sola vez y los nombres originales siguen ocupados, así
+    # ningún destino pisa a otro archivo aunque falle algún renombre.
+    targets = [None] * len(files)
+    taken_by_dir = {}
+    for i, (f, name) in enumerate(zip(files, names)):
+        # normcase: en Windows un cambio solo de mayúsculas no es renombrar
+        if not name or os.path.normcase(name) == os.path.normcase(f.name):
+            continue
+        state = taken_by_dir.get(f.parent)
+        if state is None:
+            state = taken_by_dir[f.parent] = (set(os.listdir(f.parent)), Counter())
+        taken, last_suffix = state
+        # Un archivo que ya tiene su nombre con sufijo (q_1.xml) se queda
+        # como está.
+        target = unique_file_name(name, taken, last_suffix, current=f.name)
+        if os.path.normcase(target) != os.path.normcase(f.name):
+            taken.add(target)
+            targets[i] = f.parent / target
+
+    # Fase 3: los renombres, en orden, en el proceso principal
+    with EchoBuffer() as out:
+        for f, name, target in zip(files, names, targets):
+            if target is None:
+                continue
+            try:
+                os.replace(f, target)
+            except OSError as e:
+                click.echo(f"Error en {f}: {e}", err=True)
+                continue
+            if cache:
+                cache.set(target, name)
+            out.echo(f"✓ {f} -> {target}")
+
+    if cache:
+        cache.save()
@@ -0,0 +1,71 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from questions.core.config import CONFIG_DIR
+from questions.core.files import write_text_atomic
+
+CACHE_DIR = CONFIG_DIR / "cache"
+
+class FileCache:
+    """
+    Caché persistente de resultados por archivo entre ejecuciones.
+
+    Cada entrada se indexa por la ruta absoluta y se valida con el mtime y el
+    tamaño del archivo: si cambiaron, la entrada se ignora. Se guarda como
+    JSON en ~/.questions/cache/<name>.json.
+
+    version identifica la lógica que produjo los valores: si la del archivo
+    no coincide (p. ej. tras un cambio en el parser) se descarta entera.
+    """
+
+    def __init__(self, name: str, cache_dir: Optional[Path] = None, version: int = 1):
+        self.path = Path(cache_dir or CACHE_DIR) / f"{name}.json"
+        self.version = version
+        self._entries = {}
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == version:
+            self._entries = data.get("entries", {})
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return os.path.abspath(file_path)
+
+    @staticmethod
+    def _stamp(file_path: Path) -> list:
+        st = os.stat(file_path)
+        return [st.st_mtime_ns, st.st_size]
+
+    def get(self, file_path: Path) -> Any:
+        """Devuelve el valor guardado si el archivo no cambió, o None."""
+        entry = self._entries.get(self._key(file_path))
+        if entry is None:
+            return None
+        try:
+            if entry["stamp"] != self._stamp(file_path):
+                return None
+        except OSError:
+            return None
+        return entry["value"]
+
+    def set(self, file_path: Path, value: Any):
+        """Guarda un valor para el estado actual del archivo."""
+        self._entries[self._key(file_path)] = {"stamp": self._stamp(file_path), "value": value}
+        self._dirty = True
+
+    def save(self):
+        """
+        Persiste la caché si hubo cambios, sin las entradas de archivos que
+        ya no existen.
+        """
+        if not self._dirty:
+            return
+        self._entries = {k: v for k, v in self._entries.items() if os.path.exists(k)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(self.path, json.dumps({"version": self.version, "entries": self._entries}))
+        self._dirty = False
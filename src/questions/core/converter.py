@@ -3,24 +3,63 @@ import html
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
-def convert_html_tags_to_markdown(text):
-    """Convierte tags HTML (y sus versiones fullwidth) a markdown."""
+from questions.core.files import write_text_atomic
+
+# Reglas en orden: primero las versiones fullwidth, luego las normales. El
+# orden importa con tags anidados o mezclados. Cada regla lleva el literal
+# de apertura: si no aparece en el texto, su pasada no cambiaría nada.
+_HTML_TO_MARKDOWN_RULES = [
     # Versiones fullwidth (comunes en algunos de estos archivos)
-    text = re.sub(r'＜p＞(.*?)＜/p＞', r'\1\n', text, flags=re.DOTALL)
-    text = re.sub(r'＜code＞(.*?)＜/code＞', r'`\1`', text, flags=re.DOTALL)
-    text = re.sub(r'＜strong＞(.*?)＜/strong＞', r'**\1**', text, flags=re.DOTALL)
-    text = re.sub(r'＜pre＞(.*?)＜/pre＞', r'```\n\1\n```', text, flags=re.DOTALL)
-    
+    ('＜p＞', re.compile(r'＜p＞(.*?)＜/p＞', re.DOTALL), r'\1\n'),
+    ('＜code＞', re.compile(r'＜code＞(.*?)＜/code＞', re.DOTALL), r'`\1`'),
+    ('＜strong＞', re.compile(r'＜strong＞(.*?)＜/strong＞', re.DOTALL), r'**\1**'),
+    ('＜pre＞', re.compile(r'＜pre＞(.*?)＜/pre＞', re.DOTALL), r'```\n\1\n```'),
     # Versiones normales
-    text = re.sub(r'<code>(.*?)</code>', r'`\1`', text, flags=re.DOTALL)
-    text = re.sub(r'<p>(.*?)</p>', r'\1\n', text, flags=re.DOTALL)
-    text = re.sub(r'<strong>(.*?)</strong>', r'**\1**', text, flags=re.DOTALL)
-    text = re.sub(r'<b>(.*?)</b>', r'**\1**', text, flags=re.DOTALL)
-    text = re.sub(r'<pre>(.*?)</pre>', r'```\n\1\n```', text, flags=re.DOTALL)
-    text = re.sub(r'<br\s*/?>', r'\n', text)
-    
+    ('<code>', re.compile(r'<code>(.*?)</code>', re.DOTALL), r'`\1`'),
+    ('<p>', re.compile(r'<p>(.*?)</p>', re.DOTALL), r'\1\n'),
+    ('<strong>', re.compile(r'<strong>(.*?)</strong>', re.DOTALL), r'**\1**'),
+    ('<b>', re.compile(r'<b>(.*?)</b>', re.DOTALL), r'**\1**'),
+    ('<pre>', re.compile(r'<pre>(.*?)</pre>', re.DOTALL), r'```\n\1\n```'),
+    ('<br', re.compile(r'<br\s*/?>'), r'\n'),
+]
+
+_CDATA_RE = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
+
+def convert_html_tags_to_markdown(text):
+    """Convierte tags HTML (y sus versiones fullwidth) a markdown."""
+    for literal, pattern, replacement in _HTML_TO_MARKDOWN_RULES:
+        if literal in text:
+            text = pattern.sub(replacement, text)
     return text.strip()
 
+def _replace_cdata(match):
+    return f"<![CDATA[{convert_html_tags_to_markdown(match.group(1))}]]>"
+
+def convert_xml_html_to_markdown(content: str) -> str:
+    """
+    Convierte a markdown los tags HTML dentro de las secciones CDATA de un
+    Moodle XML y cambia format="html" por format="markdown".
+    """
+    if '<![CDATA[' in content:
+        content = _CDATA_RE.sub(_replace_cdata, content)
+    return content.replace('format="html"', 'format="markdown"')
+
+def convert_html_file_to_markdown(file_path: Path) -> bool:
+    """
+    Convierte los tags HTML de un archivo XML (dentro de CDATA) o GIFT/MD a
+    markdown. Reescribe el archivo solo si cambió; devuelve si fue modificado.
+    """
+    content = file_path.read_text(encoding='utf-8')
+    if file_path.suffix.lower() == '.xml':
+        modified = convert_xml_html_to_markdown(content)
+    else:
+        modified = convert_html_tags_to_markdown(content)
+
+    if content == modified:
+        return False
+    write_text_atomic(file_path, modified)
+    return True
+
 def xml_to_gift(xml_content: str) -> str:
     """Convierte un archivo Moodle XML a GIFT (simplificado)."""
     # Esta es una implementación compleja, por ahora usaré una versión simplificada
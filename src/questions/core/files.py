@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice, repeat
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# Por debajo de este número de archivos no compensa arrancar procesos.
+MIN_PARALLEL_FILES = 8
+
+def _write_atomic(path: Path, data, mode: str, encoding: Optional[str] = None):
+    # Si path es un symlink se escribe sobre el destino real, como write_text
+    path = Path(os.path.realpath(path))
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            f.write(data)
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+def write_text_atomic(path: Path, text: str, encoding: str = 'utf-8'):
+    """
+    Escribe un archivo de texto de forma atómica.
+
+    El contenido se vuelca a un temporal en el mismo directorio y luego se
+    reemplaza el original con os.replace, así un fallo a mitad de escritura
+    nunca deja el archivo truncado.
+    """
+    _write_atomic(path, text, 'w', encoding)
+
+def write_bytes_atomic(path: Path, data: bytes):
+    """Como write_text_atomic, para contenido binario."""
+    _write_atomic(path, data, 'wb')
+
+def iter_files(root: Path, suffixes: Iterable[str], recursive: bool = False) -> Iterator[Path]:
+    """
+    Recorre un directorio con os.scandir y produce los archivos cuyas
+    extensiones están en suffixes (p. ej. {'.gift', '.xml'}).
+
+    Es una sola pasada por el árbol, sin importar cuántas extensiones se pidan.
+    """
+    suffixes = {s.lower() for s in suffixes}
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    # Sin seguir symlinks a directorios, para no entrar en ciclos
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in suffixes and entry.is_file():
+                        yield Path(entry.path)
+        except OSError:
+            continue
+
+def iter_paths(paths: Iterable[str], suffixes: Iterable[str], recursive: bool = False) -> Iterator[Path]:
+    """
+    Produce los archivos a procesar a medida que se encuentran: las rutas a
+    archivos se toman tal cual y los directorios se recorren con iter_files.
+    """
+    for p in paths:
+        path = Path(p)
+        if path.is_file():
+            yield path
+        elif path.is_dir():
+            yield from iter_files(path, suffixes, recursive)
+
+def collect_files(paths: Iterable[str], suffixes: Iterable[str], recursive: bool = False) -> List[Path]:
+    """Como iter_paths, pero devuelve la lista completa."""
+    return list(iter_paths(paths, suffixes, recursive))
+
+def _run_safely(func: Callable, path: Path, args: tuple) -> tuple:
+    try:
+        return path, func(path, *args), None
+    except Exception as e:
+        return path, None, str(e)
+
+def map_files(func: Callable, paths: Iterable[Path], *args, jobs: Optional[int] = None) -> Iterator[tuple]:
+    """
+    Aplica func(path, *args) a cada archivo y produce tuplas (path, resultado, error).
+
+    Los archivos son independientes entre sí, así que con suficientes archivos
+    el trabajo se reparte en un pool de procesos; el orden de los resultados
+    es el de la entrada. jobs=1 fuerza la ejecución secuencial. func debe ser
+    una función de módulo (picklable).
+
+    paths puede ser un generador: en modo secuencial se consume a medida que
+    se procesa, sin armar la lista de archivos.
+    """
+    paths = iter(paths)
+    head = [] if jobs == 1 else list(islice(paths, MIN_PARALLEL_FILES))
+    if jobs == 1 or len(head) < MIN_PARALLEL_FILES:
+        for path in chain(head, paths):
+            yield _run_safely(func, path, args)
+        return
+
+    paths = head + list(paths)
+    workers = jobs or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_run_safely, repeat(func), paths, repeat(args), chunksize=chunksize)
@@ -1,12 +1,32 @@
 import re
+from functools import lru_cache
 from pathlib import Path
 
+from questions.core.files import write_text_atomic
+
+_QUESTION_SPLIT_RE = re.compile(r'\n\s*\n')
+_GIFT_TITLE_RE = re.compile(r'^::(.*?)::(.*)', re.DOTALL)
+
+def _find_unescaped(text: str, char: str, start: int = 0) -> int:
+    """Primera aparición de char sin '\\' delante, o -1."""
+    i = text.find(char, start)
+    while i > 0 and text[i - 1] == '\\':
+        i = text.find(char, i + 1)
+    return i
+
+def _rfind_unescaped(text: str, char: str, start: int = 0) -> int:
+    """Última aparición de char desde start sin '\\' delante, o -1."""
+    i = text.rfind(char, start)
+    while i > 0 and text[i - 1] == '\\':
+        i = text.rfind(char, start, i)
+    return i
+
 def format_gift_content(content: str, correct_first: bool = False) -> str:
     """
     Formatea el contenido de un archivo GIFT según las reglas estandarizadas.
     """
     # Dividimos por preguntas (basado en líneas en blanco dobles)
-    questions = re.split(r'\n\s*\n', content.strip())
+    questions = _QUESTION_SPLIT_RE.split(content.strip())
     formatted_questions = []
     
     for q in questions:
@@ -30,17 +50,13 @@ def format_gift_content(content: str, correct_first: bool = False) -> str:
         
         # Extraer título
         title = ""
-        title_match = re.match(r'^::(.*?)::(.*)', remaining_content, re.DOTALL)
+        title_match = _GIFT_TITLE_RE.match(remaining_content)
         if title_match:
             title = f"::{title_match.group(1).strip()}::"
             remaining_content = title_match.group(2).strip()
             
         # Encontrar el bloque de respuestas { ... }
-        brace_start = -1
-        for i in range(len(remaining_content)):
-            if remaining_content[i] == '{' and (i == 0 or remaining_content[i-1] != '\\'):
-                brace_start = i
-                break
+        brace_start = _find_unescaped(remaining_content, '{')
         
         if brace_start == -1:
             stem = remaining_content.strip()
@@ -48,11 +64,7 @@ def format_gift_content(content: str, correct_first: bool = False) -> str:
             post_stem = ""
         else:
             stem = remaining_content[:brace_start].strip()
-            brace_end = -1
-            for i in range(len(remaining_content) - 1, brace_start, -1):
-                if remaining_content[i] == '}' and (i == 0 or remaining_content[i-1] != '\\'):
-                    brace_end = i
-                    break
+            brace_end = _rfind_unescaped(remaining_content, '}', brace_start + 1)
             
             if brace_end == -1:
                 answers_block = remaining_content[brace_start+1:].strip()
@@ -188,22 +200,61 @@ XML_ENTITIES_TO_FULLWIDTH = {
 NORMAL_TO_SPECIAL_CHARS = {v: k for k, v in SPECIAL_CHARS_TO_NORMAL.items() if v != "\n" and v != "\t"}
 FULLWIDTH_TO_XML_ENTITIES = {v: k for k, v in XML_ENTITIES_TO_FULLWIDTH.items()}
 
+# Tablas para str.translate: los reemplazos de un solo carácter se aplican en
+# una única pasada; las claves de varios caracteres (p. ej. "    " o "==")
+# se resuelven aparte con str.replace.
+_TO_NORMAL_TABLE = str.maketrans({
+    **{k: v for k, v in SPECIAL_CHARS_TO_NORMAL.items() if len(k) == 1 and k != v},
+    **{k: v for k, v in FULLWIDTH_TO_XML_ENTITIES.items() if k not in SPECIAL_CHARS_TO_NORMAL},
+})
+_TO_NORMAL_MULTI = [(k, v) for k, v in SPECIAL_CHARS_TO_NORMAL.items() if len(k) > 1]
+# Detecta si un texto contiene algo que convertir a normal; la mayoría de los
+# bloques no lo tienen y se devuelven sin tocar.
+_HAS_SPECIAL_CHARS_RE = re.compile(
+    "[" + "".join(re.escape(chr(code)) for code in _TO_NORMAL_TABLE) + "]"
+    + "".join("|" + re.escape(k) for k, _ in _TO_NORMAL_MULTI)
+)
+_TO_FULLWIDTH_TABLE = str.maketrans(
+    {k: v for k, v in NORMAL_TO_SPECIAL_CHARS.items() if len(k) == 1 and k != v}
+)
+_TO_FULLWIDTH_MULTI = [(k, v) for k, v in NORMAL_TO_SPECIAL_CHARS.items() if len(k) > 1]
+
+# Alternativa única para las entidades XML, de la más larga a la más corta.
+_XML_ENTITY_RE = re.compile(
+    "|".join(map(re.escape, sorted(XML_ENTITIES_TO_FULLWIDTH, key=len, reverse=True)))
+)
+
+# Bloque cercado (grupos 1 y 2) o código inline (grupo 3)
+_CODE_RE = re.compile(r'```([a-z]*)\n(.*?)```|`([^`\n]+)`', re.DOTALL)
+_CDATA_RE = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
+
 
+def _entity_to_fullwidth(match: re.Match) -> str:
+    return XML_ENTITIES_TO_FULLWIDTH[match.group(0)]
+
+
+@lru_cache(maxsize=8192)
 def convert_code_block_content(content: str, to_normal: bool = True) -> str:
     """
     Convierte el contenido de un bloque de código entre normal y fullwidth.
+
+    Los resultados se memorizan: los bancos de preguntas repiten muchos
+    fragmentos de código idénticos.
     """
     if to_normal:
-        for fullwidth, normal in SPECIAL_CHARS_TO_NORMAL.items():
-            content = content.replace(fullwidth, normal)
-        for fullwidth, entity in FULLWIDTH_TO_XML_ENTITIES.items():
-            if fullwidth not in SPECIAL_CHARS_TO_NORMAL:
-                content = content.replace(fullwidth, entity)
+        if _HAS_SPECIAL_CHARS_RE.search(content) is None:
+            return content
+        content = content.translate(_TO_NORMAL_TABLE)
+        for special, normal in _TO_NORMAL_MULTI:
+            content = content.replace(special, normal)
     else:
-        for entity, fullwidth in XML_ENTITIES_TO_FULLWIDTH.items():
-            content = content.replace(entity, fullwidth)
-        for normal, fullwidth in NORMAL_TO_SPECIAL_CHARS.items():
-            content = content.replace(normal, fullwidth)
+        if '&' in content:
+            content = _XML_ENTITY_RE.sub(_entity_to_fullwidth, content)
+        # Las claves compuestas ("==") van antes que la tabla para que no
+        # queden partidas por el reemplazo de "=".
+        for normal, special in _TO_FULLWIDTH_MULTI:
+            content = content.replace(normal, special)
+        content = content.translate(_TO_FULLWIDTH_TABLE)
     return content
 
 
@@ -212,28 +263,29 @@ def convert_markdown_code_blocks(text: str, to_normal: bool = True) -> tuple[str
     Convierte caracteres especiales en bloques de código markdown.
     """
     blocks_modified = 0
-    
-    def replace_code_block(match):
-        nonlocal blocks_modified
-        lang = match.group(1) or ''
+    parts = []
+    last = 0
+    # Bloques cercados e inline en una sola pasada
+    for match in _CODE_RE.finditer(text):
         content = match.group(2)
+        fenced = content is not None
+        if not fenced:
+            content = match.group(3)
         converted = convert_code_block_content(content, to_normal)
-        if converted != content:
-            blocks_modified += 1
-        return f"```{lang}\n{converted}\n```"
-    
-    text = re.sub(r'```([a-z]*)\n(.*?)```', replace_code_block, text, flags=re.DOTALL)
-    
-    def replace_inline_code(match):
-        nonlocal blocks_modified
-        content = match.group(1)
-        converted = convert_code_block_content(content, to_normal)
-        if converted != content:
-            blocks_modified += 1
-        return f"`{converted}`"
-    
-    text = re.sub(r'`([^`\n]+)`', replace_inline_code, text)
-    return text, blocks_modified
+        if converted == content:
+            continue
+        blocks_modified += 1
+        parts.append(text[last:match.start()])
+        if fenced:
+            parts.append(f"```{match.group(1)}\n{converted}\n```")
+        else:
+            parts.append(f"`{converted}`")
+        last = match.end()
+
+    if not parts:
+        return text, 0
+    parts.append(text[last:])
+    return "".join(parts), blocks_modified
 
 
 def process_xml_cdata(text: str, to_normal: bool = True) -> tuple[str, int]:
@@ -241,12 +293,52 @@ def process_xml_cdata(text: str, to_normal: bool = True) -> tuple[str, int]:
     Procesa secciones CDATA en archivos XML.
     """
     total_blocks = 0
-    def replace_cdata(match):
-        nonlocal total_blocks
-        cdata_content = match.group(1)
-        converted_content, blocks = convert_markdown_code_blocks(cdata_content, to_normal)
-        total_blocks += blocks
-        return f"<![CDATA[{converted_content}]]>"
-    
-    text = re.sub(r'<!\[CDATA\[(.*?)\]\]>', replace_cdata, text, flags=re.DOTALL)
-    return text, total_blocks
+    parts = []
+    last = 0
+    for match in _CDATA_RE.finditer(text):
+        converted_content, blocks = convert_markdown_code_blocks(match.group(1), to_normal)
+        if blocks:
+            total_blocks += blocks
+            parts.append(text[last:match.start(1)])
+            parts.append(converted_content)
+            last = match.end(1)
+
+    if not parts:
+        return text, 0
+    parts.append(text[last:])
+    return "".join(parts), total_blocks
+
+
+# Versión de la conversión para la caché de fix code-chars --cache; hay que
+# subirla cuando cambien las tablas o las reglas de conversión.
+CODE_CHARS_CACHE_VERSION = 1
+
+
+def convert_code_chars_in_file(file_path: Path, to_normal: bool = True) -> int:
+    """
+    Convierte los caracteres especiales de los bloques de código de un archivo.
+
+    Usa process_xml_cdata para .xml y convert_markdown_code_blocks para el
+    resto. Solo reescribe el archivo si hubo cambios; devuelve la cantidad de
+    bloques modificados.
+    """
+    raw = file_path.read_bytes()
+    # Sin backticks no hay bloques de código: se evita decodificar el archivo
+    if b'`' not in raw:
+        return 0
+    is_xml = file_path.suffix.lower() == '.xml'
+    if is_xml and b'<![CDATA[' not in raw:
+        return 0
+
+    content = raw.decode('utf-8')
+    if '\r' in content:
+        # Mismos saltos de línea que read_text
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    if is_xml:
+        new_content, count = process_xml_cdata(content, to_normal)
+    else:
+        new_content, count = convert_markdown_code_blocks(content, to_normal)
+
+    if count > 0:
+        write_text_atomic(file_path, new_content)
+    return count
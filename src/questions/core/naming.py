@@ -1,8 +1,9 @@
 import re
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Optional
 
+from questions.core.xml_tools import question_name
+
 def slugify(text: str) -> str:
     """Convierte un texto en un slug (minúsculas, sin caracteres especiales, guiones bajos)."""
     # Eliminar acentos y caracteres especiales básicos
@@ -22,12 +23,9 @@ def get_question_title(file_path: Path) -> Optional[str]:
             return title_match.group(1).strip()
     elif file_path.suffix == '.xml':
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            # Buscar en la estructura típica de Moodle XML
-            name_elem = root.find('.//question/name/text')
-            if name_elem is not None and name_elem.text:
-                return name_elem.text.strip()
+            name = question_name(file_path)
+            if name:
+                return name.strip()
         except Exception:
             pass
     return None
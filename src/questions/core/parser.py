@@ -83,6 +83,31 @@ eol = /\r\n|\n|\r/ ;
 blank_line = /[ \t]*/ eol ;
 '''
 
+# Versión del resultado de parse_gift_file guardado en la caché de
+# analyze --cache; hay que subirla cuando cambie lo que devuelve el parser.
+PARSE_CACHE_VERSION = 1
+
+# Expresiones regulares del parseo manual, compiladas una sola vez
+_ID_RE = re.compile(r'\[id:([^\]]+)\]')
+_TAG_RE = re.compile(r'\[tag:([^\]]+)\]')
+_TITLE_RE = re.compile(r'^::([^:]+(?::(?!:)[^:]*)*)::(.*)$', re.DOTALL)
+_FORMAT_RE = re.compile(r'^\[(html|markdown|plain|moodle)\](.*)$', re.DOTALL)
+_TF_RE = re.compile(r'^(TRUE|FALSE|T|F)\s*(?:#(.*))?$', re.IGNORECASE | re.DOTALL)
+_GLOBAL_FEEDBACK_RE = re.compile(r'####(.+)$', re.DOTALL)
+_TF_FEEDBACK_SPLIT_RE = re.compile(r'(?<!#)#(?!###)')
+_NUMERICAL_CHOICE_RE = re.compile(r'([=~])(%[+-]?\d+(?:\.\d+)?%)?([^=~#]*?)(?:#([^=~]*))?(?=[=~]|$)', re.DOTALL)
+_MATCH_PAIR_RE = re.compile(r'=\s*([^->=~]*?)\s*->\s*([^=~\n\r]+)', re.DOTALL)
+_CHOICE_RE = re.compile(
+    r'([=~])\s*(%[+-]?\d+(?:\.\d+)?%)?\s*([^=~#]*?)(?:#([^=~]*))?(?=[=~]|$)',
+    re.DOTALL
+)
+_ESCAPE_RE = re.compile(r'\\([\\:#={}~n])')
+_UNESCAPED = {'n': '\n'}
+
+def _unescape(match: re.Match) -> str:
+    char = match.group(1)
+    return _UNESCAPED.get(char, char)
+
 
 class QuestionType(Enum):
     CATEGORY = "Category"
@@ -193,11 +218,11 @@ class GiftSemantics:
                 continue
             comment_str = str(comment)
             # Extract ID
-            id_match = re.search(r'\[id:([^\]]+)\]', comment_str)
+            id_match = _ID_RE.search(comment_str)
             if id_match:
                 question_id = id_match.group(1).strip()
             # Extract tags
-            for tag_match in re.finditer(r'\[tag:([^\]]+)\]', comment_str):
+            for tag_match in _TAG_RE.finditer(comment_str):
                 tags.append(tag_match.group(1).strip())
         
         return tags, question_id
@@ -206,16 +231,9 @@ class GiftSemantics:
         """Decode escaped characters in GIFT format."""
         if not text:
             return ""
-        return (text
-            .replace('\\\\', '\x00')  # Temporary placeholder
-            .replace('\\:', ':')
-            .replace('\\#', '#')
-            .replace('\\=', '=')
-            .replace('\\{', '{')
-            .replace('\\}', '}')
-            .replace('\\~', '~')
-            .replace('\\n', '\n')
-            .replace('\x00', '\\'))
+        if '\\' not in text:
+            return text
+        return _ESCAPE_RE.sub(_unescape, text)
     
     def _parse_formatted_text(self, ast) -> FormattedText:
         """Parse formatted text from AST."""
@@ -329,7 +347,7 @@ class GiftParser:
         
         # Extract title
         title = None
-        title_match = re.match(r'^::([^:]+(?::(?!:)[^:]*)*)::(.*)$', text, re.DOTALL)
+        title_match = _TITLE_RE.match(text)
         if title_match:
             title = title_match.group(1).strip()
             text = title_match.group(2)
@@ -372,7 +390,7 @@ class GiftParser:
         fmt = "moodle"
         
         # Check for format at start
-        format_match = re.match(r'^\[(html|markdown|plain|moodle)\](.*)$', text, re.DOTALL)
+        format_match = _FORMAT_RE.match(text)
         if format_match:
             fmt = format_match.group(1)
             text = format_match.group(2)
@@ -391,7 +409,7 @@ class GiftParser:
             return Question(type="Essay")
         
         # True/False
-        tf_match = re.match(r'^(TRUE|FALSE|T|F)\s*(?:#(.*))?$', block, re.IGNORECASE | re.DOTALL)
+        tf_match = _TF_RE.match(block)
         if tf_match:
             is_true = tf_match.group(1).upper() in ('TRUE', 'T')
             feedback_text = tf_match.group(2) or ""
@@ -404,7 +422,7 @@ class GiftParser:
                 q.false_feedback = feedbacks[1]
             
             # Check for global feedback
-            gf_match = re.search(r'####(.+)$', block, re.DOTALL)
+            gf_match = _GLOBAL_FEEDBACK_RE.search(block)
             if gf_match:
                 q.global_feedback = semantics._parse_formatted_text(gf_match.group(1))
             
@@ -428,7 +446,7 @@ class GiftParser:
             return feedbacks
         
         # Split by # but not ####
-        parts = re.split(r'(?<!#)#(?!###)', text)
+        parts = _TF_FEEDBACK_SPLIT_RE.split(text)
         for part in parts:
             if part.strip() and not part.strip().startswith('###'):
                 feedbacks.append(semantics._parse_formatted_text(part))
@@ -441,14 +459,13 @@ class GiftParser:
         
         # Check for global feedback
         global_feedback = None
-        gf_match = re.search(r'####(.+)$', block, re.DOTALL)
+        gf_match = _GLOBAL_FEEDBACK_RE.search(block)
         if gf_match:
             global_feedback = semantics._parse_formatted_text(gf_match.group(1))
             block = block[:gf_match.start()]
         
         # Multiple numerical choices
-        choice_pattern = re.compile(r'([=~])(%[+-]?\d+(?:\.\d+)?%)?([^=~#]*?)(?:#([^=~]*))?(?=[=~]|$)', re.DOTALL)
-        matches = list(choice_pattern.finditer(block))
+        matches = list(_NUMERICAL_CHOICE_RE.finditer(block))
         
         if matches:
             for m in matches:
@@ -477,14 +494,13 @@ class GiftParser:
         
         # Check for global feedback
         global_feedback = None
-        gf_match = re.search(r'####(.+)$', block, re.DOTALL)
+        gf_match = _GLOBAL_FEEDBACK_RE.search(block)
         if gf_match:
             global_feedback = semantics._parse_formatted_text(gf_match.group(1))
             block = block[:gf_match.start()]
         
         # Parse match pairs
-        match_pattern = re.compile(r'=\s*([^->=~]*?)\s*->\s*([^=~\n\r]+)', re.DOTALL)
-        for m in match_pattern.finditer(block):
+        for m in _MATCH_PAIR_RE.finditer(block):
             left, right = m.groups()
             pairs.append(MatchPair(
                 subquestion=semantics._parse_formatted_text(left),
@@ -499,19 +515,14 @@ class GiftParser:
         
         # Check for global feedback
         global_feedback = None
-        gf_match = re.search(r'####(.+)$', block, re.DOTALL)
+        gf_match = _GLOBAL_FEEDBACK_RE.search(block)
         if gf_match:
             global_feedback = semantics._parse_formatted_text(gf_match.group(1))
             block = block[:gf_match.start()]
         
         # Parse choices
         # Pattern: [=~] optional_weight text optional_feedback
-        choice_pattern = re.compile(
-            r'([=~])\s*(%[+-]?\d+(?:\.\d+)?%)?\s*([^=~#]*?)(?:#([^=~]*))?(?=[=~]|$)',
-            re.DOTALL
-        )
-        
-        for m in choice_pattern.finditer(block):
+        for m in _CHOICE_RE.finditer(block):
             symbol, weight, text, feedback = m.groups()
             if not text or not text.strip():
                 continue
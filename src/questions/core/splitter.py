@@ -30,9 +30,8 @@ def split_file(file_path: Path) -> int:
     count = 0
     for i, q in enumerate(questions):
         title = extract_title(q)
-        if title:
-            base_name = sanitize_filename(title)
-        else:
+        base_name = sanitize_filename(title) if title else ""
+        if not base_name:
             base_name = f"{file_path.stem}_{i+1}"
             
         new_filename = f"{base_name}.gift"
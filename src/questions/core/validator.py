@@ -5,17 +5,46 @@ Genera un informe detallado con estadísticas, problemas detectados y recomendac
 """
 
 import argparse
+import io
 import json
 import math
 import re
+import sys
 from collections import Counter, defaultdict
 from dataclasses import dataclass, field
+from itertools import chain
 from pathlib import Path
 from typing import Optional
 
+from questions.core.cache import FileCache
+from questions.core.files import iter_files, map_files
 from questions.core.parser import parse_gift_file, get_question_summary
 
 
+_NON_WORD_RE = re.compile(r'[^a-záéíóúñü0-9\s]')
+# Tabla equivalente a _NON_WORD_RE para Latin-1 y Latin Extended-A, que
+# cubren casi todo el texto en español; con caracteres más allá se usa la
+# regex.
+_TRANSLATE_LIMIT = '\u0180'
+_NON_WORD_TABLE = str.maketrans({
+    c: ' ' for c in map(chr, range(ord(_TRANSLATE_LIMIT)))
+    if _NON_WORD_RE.match(c)
+})
+# Tolerancia al comparar similitudes con el threshold: dos textos con las
+# mismas palabras dan 1.0 salvo por redondeo.
+_SIMILARITY_EPS = 1e-9
+_REPORT_BUFFER_SIZE = 1 << 20
+_DUPLICATE_TEMPLATE = (
+    "Duplicado {idx}: Similitud = {similarity:.3f}\n"
+    "  Pregunta A ({type1}): {title1}\n"
+    "    Archivo: {path1}\n"
+    "  Pregunta B ({type2}): {title2}\n"
+    "    Archivo: {path2}\n"
+    "  Comando: meld -n '{path1}' '{path2}'\n"
+    "\n"
+)
+
+
 @dataclass
 class GiftStats:
     """Statistics for GIFT analysis."""
@@ -38,10 +67,19 @@ class GiftStats:
 class GiftAnalyzer:
     """Analyzer for GIFT question directories."""
     
-    def __init__(self, similarity_threshold: float = 0.85, recursive: bool = True, verbose: bool = False):
+    def __init__(self, similarity_threshold: float = 0.85, recursive: bool = True, verbose: bool = False,
+                 jobs: Optional[int] = None, min_tokens: int = 3, cache: Optional[FileCache] = None,
+                 min_df: int = 1, max_df: float = 1.0):
         self.similarity_threshold = similarity_threshold
+        self.min_tokens = min_tokens
+        # Poda del vocabulario TF-IDF: palabras en menos de min_df documentos
+        # o en más de max_df (fracción) de ellos; por defecto no se poda nada
+        self.min_df = min_df
+        self.max_df = max_df
+        self.cache = cache
         self.recursive = recursive
         self.verbose = verbose
+        self.jobs = jobs
         
         self.stats = GiftStats()
         self.categories: dict = defaultdict(list)
@@ -50,26 +88,20 @@ class GiftAnalyzer:
         self.duplicates: list = []
         self.descriptions: list = []  # Preguntas tipo Description (posibles problemas)
         self.base_path: Path = Path('.')
+        self._base_parts: tuple = ()
     
     def find_gift_files(self, directory: Path) -> list:
         """Find all .gift files in directory."""
-        if self.recursive:
-            return list(directory.rglob('*.gift'))
-        return list(directory.glob('*.gift'))
+        return list(iter_files(directory, {'.gift'}, self.recursive))
     
-    def analyze_file(self, filepath: Path):
-        """Analyze a single GIFT file."""
+    def analyze_file(self, filepath: Path, result: Optional[dict] = None):
+        """Analyze a single GIFT file (optionally with an already parsed result)."""
         self.stats.total_files += 1
         
-        # Calculate depth
-        try:
-            rel_path = filepath.relative_to(self.base_path)
-            depth = len(rel_path.parts) - 1
-        except ValueError:
-            depth = 0
-        self.stats.files_by_depth[depth] += 1
+        self.stats.files_by_depth[self._depth(filepath)] += 1
         
-        result = parse_gift_file(str(filepath))
+        if result is None:
+            result = parse_gift_file(str(filepath))
         
         if not result["success"]:
             self.stats.invalid_files += 1
@@ -91,15 +123,30 @@ class GiftAnalyzer:
         for question in result["questions"]:
             self.analyze_question(question, filepath)
     
+    def _depth(self, filepath: Path) -> int:
+        """Profundidad del archivo respecto de base_path (0 si está fuera)."""
+        # Comparación de componentes equivalente a relative_to, sin crear
+        # un Path nuevo por archivo
+        parts = filepath.parts
+        base = self._base_parts
+        if parts[:len(base)] != base or (not base and filepath.is_absolute()):
+            return 0
+        return len(parts) - len(base) - 1
+    
     def analyze_question(self, question: dict, filepath: Path):
         """Analyze a single question."""
+        # Tipo y ruta se repiten en muchas preguntas: se internan para que
+        # todas compartan el mismo objeto str
         q_type = question.get("type", "Unknown")
+        if isinstance(q_type, str):
+            q_type = sys.intern(q_type)
+        path_str = sys.intern(str(filepath))
         
         # Handle categories
         if q_type == "Category":
             category = question.get("title", "Sin categoría")
             self.stats.by_category[category] += 1
-            self.categories[category].append(str(filepath))
+            self.categories[category].append(path_str)
             return
         
         # Handle descriptions
@@ -110,7 +157,7 @@ class GiftAnalyzer:
             stem = question.get("stem", {})
             stem_text = stem.get("text", "") if isinstance(stem, dict) else ""
             self.descriptions.append({
-                "filepath": str(filepath),
+                "filepath": path_str,
                 "title": title or "<sin título>",
                 "text": stem_text[:100] if stem_text else "<sin texto>"
             })
@@ -138,22 +185,20 @@ class GiftAnalyzer:
         tags = question.get("tags", [])
         if tags:
             self.stats.with_tags += 1
-            for tag in tags:
-                self.stats.by_tag[tag] += 1
+            self.stats.by_tag.update(tags)
         else:
             self.stats.without_tags += 1
         
         # Type-specific validations
         self._validate_by_type(question, filepath)
         
-        # Store for duplicate analysis
+        # Store for duplicate analysis. Solo se guarda el texto completo: el
+        # enunciado y las respuestas sueltas eran copias que nada leía.
         answer_texts = self._extract_answer_texts(question)
         self.all_questions.append({
-            "filepath": str(filepath),
+            "filepath": path_str,
             "type": q_type,
             "title": title,
-            "text": stem_text,
-            "answers": answer_texts,
             "full_text": f"{title} {stem_text} {' '.join(answer_texts)}"
         })
     
@@ -183,14 +228,12 @@ class GiftAnalyzer:
         
         if q_type == "MC":
             choices = question.get("choices", [])
-            correct_count = sum(1 for c in choices if c.get("is_correct"))
-            total_weight = sum(
-                c.get("weight", 100 if c.get("is_correct") else 0)
-                for c in choices
-                if c.get("is_correct") or (c.get("weight") and c.get("weight") > 0)
-            )
+            has_correct = any(c.get("is_correct") for c in choices)
             
-            if correct_count == 0 and total_weight < 95:
+            # El peso total solo importa si ninguna opción está marcada como correcta
+            if not has_correct and sum(
+                c["weight"] for c in choices if c.get("weight") and c["weight"] > 0
+            ) < 95:
                 self.issues.append(f"⚠️  {filepath}: Pregunta MC sin respuesta correcta - {title}")
         
         elif q_type == "Matching":
@@ -207,9 +250,12 @@ class GiftAnalyzer:
         """Clean and normalize text for comparison."""
         text = text.lower()
         # Mantener letras, números y espacios
-        text = re.sub(r'[^a-záéíóúñü0-9\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        if text and max(text) >= _TRANSLATE_LIMIT:
+            text = _NON_WORD_RE.sub(' ', text)
+        else:
+            text = text.translate(_NON_WORD_TABLE)
+        # Colapsar espacios
+        return ' '.join(text.split())
     
     def _tokenize(self, text: str) -> list:
         """Tokenize text into words, keeping all tokens."""
@@ -217,33 +263,29 @@ class GiftAnalyzer:
         # Mantener todas las palabras/tokens, incluyendo números
         return [w for w in words if w]
     
-    def _compute_word_freq(self, text: str) -> dict:
+    def _compute_word_freq(self, words: list) -> dict:
         """Compute word frequency."""
-        words = self._tokenize(text)
-        freq = defaultdict(int)
-        for word in words:
-            freq[word] += 1
-        return dict(freq)
-    
-    def _compute_idf(self, all_texts: list) -> dict:
-        """Compute IDF (inverse document frequency)."""
-        doc_count = defaultdict(int)
-        num_docs = len(all_texts)
-        
-        for text in all_texts:
-            words = set(self._tokenize(text))
-            for word in words:
-                doc_count[word] += 1
-        
-        idf = {}
-        for word, count in doc_count.items():
-            idf[word] = math.log(num_docs / (1 + count))
-        
-        return idf
-    
-    def _compute_tfidf_vector(self, text: str, idf: dict) -> dict:
-        """Compute TF-IDF vector."""
-        freq = self._compute_word_freq(text)
+        return Counter(words)
+    
+    def _compute_idf(self, token_sets: list) -> dict:
+        """Compute IDF (inverse document frequency) from each document's token set."""
+        doc_count = Counter(chain.from_iterable(token_sets))
+        num_docs = len(token_sets)
+        
+        # El IDF solo depende de la frecuencia y hay pocas frecuencias
+        # distintas (la mayoría de las palabras aparece 1 o 2 veces): un log
+        # por frecuencia en lugar de uno por palabra.
+        max_count = self.max_df * num_docs
+        log_by_count = {
+            count: math.log(num_docs / (1 + count))
+            for count in set(doc_count.values())
+            if self.min_df <= count <= max_count
+        }
+        return {word: log_by_count[count] for word, count in doc_count.items() if count in log_by_count}
+    
+    def _compute_tfidf_vector(self, words: list, idf: dict) -> dict:
+        """Compute TF-IDF vector from a document's tokens."""
+        freq = self._compute_word_freq(words)
         total_words = sum(freq.values())
         
         if total_words == 0:
@@ -251,37 +293,49 @@ class GiftAnalyzer:
         
         tfidf = {}
         for word, count in freq.items():
+            # Las palabras podadas del vocabulario no entran en el vector
+            if word not in idf:
+                continue
             tf = count / total_words
-            tfidf[word] = tf * idf.get(word, 0)
+            tfidf[word] = tf * idf[word]
         
         return tfidf
     
+    def _normalize(self, vec: dict) -> dict:
+        """
+        Escala un vector TF-IDF a norma 1; un vector nulo queda vacío.
+
+        Con los vectores normalizados una sola vez, el coseno de cada par es
+        directamente el producto punto.
+        """
+        magnitude = math.sqrt(sum(v * v for v in vec.values()))
+        if magnitude == 0:
+            return {}
+        return {word: v / magnitude for word, v in vec.items()}
+    
     def _cosine_similarity(self, vec1: dict, vec2: dict) -> float:
-        """Compute cosine similarity."""
+        """Compute cosine similarity between two normalized vectors."""
         if not vec1 or not vec2:
             return 0.0
-        
-        # Unión de todas las palabras
-        all_words = set(vec1.keys()) | set(vec2.keys())
-        
-        if not all_words:
-            return 0.0
-        
-        # Calcular producto punto y magnitudes considerando todas las palabras
-        dot_product = sum(vec1.get(word, 0) * vec2.get(word, 0) for word in all_words)
-        mag1 = math.sqrt(sum(v ** 2 for v in vec1.values()))
-        mag2 = math.sqrt(sum(v ** 2 for v in vec2.values()))
-        
-        if mag1 == 0 or mag2 == 0:
-            return 0.0
-        
-        return dot_product / (mag1 * mag2)
+        if vec1 is vec2:
+            # Un vector consigo mismo (copias exactas): 1 sin depender del
+            # redondeo del cálculo general
+            return 1.0
+        
+        # Solo las palabras comunes aportan al producto punto: se recorre el
+        # vector más chico y se busca en el otro
+        small, large = (vec1, vec2) if len(vec1) <= len(vec2) else (vec2, vec1)
+        get = large.get
+        dot_product = 0.0
+        for word, value in small.items():
+            other = get(word)
+            if other is not None:
+                dot_product += value * other
+        
+        return dot_product
     
-    def _jaccard_similarity(self, text1: str, text2: str) -> float:
-        """Compute Jaccard similarity between two texts."""
-        words1 = set(self._tokenize(text1))
-        words2 = set(self._tokenize(text2))
-        
+    def _jaccard_similarity(self, words1: set, words2: set) -> float:
+        """Compute Jaccard similarity between two token sets."""
         if not words1 or not words2:
             return 0.0
         
@@ -290,19 +344,61 @@ class GiftAnalyzer:
         
         return intersection / union if union > 0 else 0.0
     
-    def _combined_similarity(self, q1: dict, q2: dict) -> float:
+    def _combined_similarity(self, vec1: dict, vec2: dict, words1: set, words2: set) -> float:
         """Compute combined similarity using multiple metrics."""
         # Similitud de coseno TF-IDF
-        cosine_sim = self._cosine_similarity(q1["vector"], q2["vector"])
+        cosine_sim = self._cosine_similarity(vec1, vec2)
         
         # Similitud Jaccard (más sensible a diferencias en palabras individuales)
-        jaccard_sim = self._jaccard_similarity(q1["clean_text"], q2["clean_text"])
+        jaccard_sim = self._jaccard_similarity(words1, words2)
         
         # Combinar: promedio ponderado (Jaccard es más estricto)
         combined = (cosine_sim * 0.4) + (jaccard_sim * 0.6)
         
         return combined
     
+    def _min_jaccard(self) -> float:
+        """Jaccard mínimo para que un par pueda llegar al threshold (coseno <= 1)."""
+        # Margen para no descartar pares en el borde por redondeo
+        return (self.similarity_threshold - _SIMILARITY_EPS - 0.4) / 0.6 - _SIMILARITY_EPS
+    
+    def _candidate_pairs(self, token_sets: list) -> list:
+        """
+        Pares (i, j) que pueden superar el threshold, en orden.
+
+        La similitud combinada es 0.4 * coseno + 0.6 * Jaccard y el coseno no
+        supera 1, así que un duplicado necesita Jaccard >= (t - 0.4) / 0.6.
+        Con los tokens ordenados de más raro a más común, dos conjuntos con
+        ese Jaccard comparten al menos un token de sus prefijos (filtro de
+        prefijos), así que basta con indexar los prefijos. Además, como el
+        Jaccard no supera el cociente entre el tamaño menor y el mayor, se
+        descartan los pares de tamaños muy distintos. Los filtros son
+        exactos: no se pierde ningún par.
+        """
+        n = len(token_sets)
+        min_jaccard = self._min_jaccard()
+        if min_jaccard <= 0:
+            return [(i, j) for i in range(n) for j in range(i + 1, n)]
+        
+        doc_freq = Counter(token for tokens in token_sets for token in tokens)
+        sizes = [len(tokens) for tokens in token_sets]
+        index = defaultdict(list)
+        candidates = set()
+        for i, tokens in enumerate(token_sets):
+            size = sizes[i]
+            ordered = sorted(tokens, key=lambda t: (doc_freq[t], t))
+            prefix_len = size - math.ceil(min_jaccard * size) + 1
+            for token in ordered[:prefix_len]:
+                postings = index[token]
+                for j in postings:
+                    # Filtro por tamaño: el Jaccard no supera menor / mayor
+                    other = sizes[j]
+                    if min(size, other) >= min_jaccard * max(size, other):
+                        candidates.add((j, i))
+                postings.append(i)
+        
+        return sorted(candidates)
+    
     def find_duplicates(self):
         """Find duplicate or very similar questions."""
         self.duplicates = []
@@ -312,40 +408,95 @@ class GiftAnalyzer:
         if self.verbose:
             print(f"Buscando duplicados con threshold {self.similarity_threshold}...")
         
-        # Prepare texts
-        for q in self.all_questions:
-            q["clean_text"] = self._clean_text(q["full_text"])
-        
-        # Compute IDF
-        all_texts = [q["clean_text"] for q in self.all_questions]
-        idf = self._compute_idf(all_texts)
+        # Datos de trabajo en listas paralelas, sin agregar campos a cada
+        # pregunta; positions guarda el índice en all_questions. Los textos
+        # con menos de min_tokens palabras (preguntas casi vacías) quedan
+        # fuera de la búsqueda y del IDF.
+        # Cada texto se tokeniza una sola vez; IDF, vectores y conjuntos de
+        # tokens salen de la misma lista. Las palabras se reemplazan por un
+        # id entero del vocabulario: hashear y comparar enteros es más
+        # barato que hacerlo con cadenas en vectores e intersecciones.
+        vocab = {}
+        positions = []
+        clean_texts = []
+        token_lists = []
+        for pos, q in enumerate(self.all_questions):
+            text = self._clean_text(q["full_text"])
+            tokens = self._tokenize(text)
+            if len(tokens) >= self.min_tokens:
+                positions.append(pos)
+                clean_texts.append(text)
+                token_lists.append([vocab.setdefault(t, len(vocab)) for t in tokens])
+        if len(clean_texts) < 2:
+            return
         
-        # Compute TF-IDF vectors
-        for q in self.all_questions:
-            q["vector"] = self._compute_tfidf_vector(q["clean_text"], idf)
+        token_sets = [set(tokens) for tokens in token_lists]
+        idf = self._compute_idf(token_sets)
+        vectors = [self._normalize(self._compute_tfidf_vector(tokens, idf)) for tokens in token_lists]
+        
+        # Las preguntas con el mismo texto normalizado tienen el mismo vector
+        # y los mismos tokens: se agrupan y solo se compara un representante
+        # (la primera aparición) por grupo.
+        buckets = defaultdict(list)
+        for i, text in enumerate(clean_texts):
+            buckets[text].append(i)
+        groups = list(buckets.values())
+        threshold = self.similarity_threshold - _SIMILARITY_EPS
+        
+        # Pares dentro de cada grupo de copias exactas
+        for members in groups:
+            if len(members) < 2:
+                continue
+            r = members[0]
+            similarity = self._combined_similarity(vectors[r], vectors[r], token_sets[r], token_sets[r])
+            if similarity >= threshold:
+                for k, i in enumerate(members):
+                    for j in members[k + 1:]:
+                        self.duplicates.append({
+                            "index1": positions[i],
+                            "index2": positions[j],
+                            "similarity": similarity
+                        })
         
         # Compare questions
-        for i in range(len(self.all_questions)):
-            for j in range(i + 1, len(self.all_questions)):
-                # Usar similitud combinada (TF-IDF coseno + Jaccard)
-                similarity = self._combined_similarity(
-                    self.all_questions[i],
-                    self.all_questions[j]
-                )
-                
-                if similarity >= self.similarity_threshold:
-                    self.duplicates.append({
-                        "index1": i,
-                        "index2": j,
-                        "similarity": similarity
-                    })
+        rep_token_sets = [token_sets[members[0]] for members in groups]
+        min_jaccard = self._min_jaccard()
+        for a, b in self._candidate_pairs(rep_token_sets):
+            # Los candidatos comparten algún token del prefijo, pero el
+            # Jaccard completo puede quedar corto: en ese caso ni con coseno
+            # 1 se llega al threshold y no hace falta calcularlo.
+            if self._jaccard_similarity(rep_token_sets[a], rep_token_sets[b]) < min_jaccard:
+                continue
+            
+            # El resultado vale para todas las copias de ambos grupos; se
+            # calcula una vez por orden de argumentos (el del par original,
+            # menor índice primero) para obtener exactamente el mismo valor.
+            similarities = {}
+            for i in groups[a]:
+                for j in groups[b]:
+                    first, second = (a, b) if i < j else (b, a)
+                    similarity = similarities.get(first)
+                    if similarity is None:
+                        r1, r2 = groups[first][0], groups[second][0]
+                        # Usar similitud combinada (TF-IDF coseno + Jaccard)
+                        similarity = similarities[first] = self._combined_similarity(
+                            vectors[r1], vectors[r2], token_sets[r1], token_sets[r2]
+                        )
+                    
+                    if similarity >= threshold:
+                        self.duplicates.append({
+                            "index1": positions[min(i, j)],
+                            "index2": positions[max(i, j)],
+                            "similarity": similarity
+                        })
         
         # Sort by similarity
-        self.duplicates.sort(key=lambda x: x["similarity"], reverse=True)
+        self.duplicates.sort(key=lambda x: (-x["similarity"], x["index1"], x["index2"]))
     
     def scan_directory(self, directory: str):
         """Scan a directory for GIFT files."""
         self.base_path = Path(directory)
+        self._base_parts = self.base_path.parts
         
         gift_files = self.find_gift_files(self.base_path)
         
@@ -355,170 +506,213 @@ class GiftAnalyzer:
         
         print(f"Escaneando {len(gift_files)} archivos GIFT...")
         
+        # Con caché, los archivos sin cambios desde la última ejecución no se
+        # vuelven a parsear
+        cached = {}
+        to_parse = gift_files
+        if self.cache is not None:
+            for filepath in gift_files:
+                result = self.cache.get(filepath)
+                if result is not None:
+                    cached[filepath] = result
+            to_parse = [f for f in gift_files if f not in cached]
+        
+        # El parseo de cada archivo es independiente y se reparte entre
+        # procesos; el análisis se acumula acá, en orden.
+        results = map_files(parse_gift_file, to_parse, jobs=self.jobs)
         for i, filepath in enumerate(gift_files, 1):
             if self.verbose and i % 10 == 0:
                 print(f"  Procesados {i}/{len(gift_files)} archivos...")
-            self.analyze_file(filepath)
+            result = cached.get(filepath)
+            if result is None:
+                _, result, error = next(results)
+                if error is not None:
+                    result = {"success": False, "filepath": str(filepath), "error": {"message": error}}
+                elif self.cache is not None:
+                    self.cache.set(filepath, result)
+            self.analyze_file(filepath, result)
+        
+        if self.cache is not None:
+            self.cache.save()
         
         self.find_duplicates()
     
-    def generate_report(self, output_file: Optional[str] = None) -> str:
-        """Generate the analysis report."""
-        lines = []
+    def generate_report(self, output_file: Optional[str] = None) -> Optional[str]:
+        """
+        Generate the analysis report.
+
+        Con output_file el informe se escribe directo al archivo, sin armarlo
+        en memoria, y se devuelve None; si no, se devuelve como texto.
+        """
+        if output_file:
+            # Buffer grande: el informe se escribe en muchos fragmentos chicos
+            with open(output_file, 'w', encoding='utf-8', buffering=_REPORT_BUFFER_SIZE) as f:
+                self._write_report(f)
+            print(f"\n✅ Informe guardado en: {output_file}")
+            return None
+        
+        buf = io.StringIO()
+        self._write_report(buf)
+        return buf.getvalue()
+    
+    def _write_report(self, out):
+        """Escribe el informe en un stream de texto, línea por línea."""
+        write = out.write
         
-        lines.append("=" * 80)
-        lines.append("INFORME DE EVALUACIÓN DE PREGUNTAS GIFT")
-        lines.append("=" * 80)
-        lines.append("")
+        def line(text: str = ""):
+            write(text)
+            write("\n")
+        
+        line("=" * 80)
+        line("INFORME DE EVALUACIÓN DE PREGUNTAS GIFT")
+        line("=" * 80)
+        line()
         
         # General summary
-        lines.append("📊 RESUMEN GENERAL")
-        lines.append("-" * 80)
-        lines.append(f"Total de archivos GIFT: {self.stats.total_files}")
-        lines.append(f"  ✅ Archivos válidos: {self.stats.valid_files}")
-        lines.append(f"  ❌ Archivos inválidos: {self.stats.invalid_files}")
-        lines.append(f"Total de preguntas: {self.stats.total_questions}")
-        lines.append("")
+        line("📊 RESUMEN GENERAL")
+        line("-" * 80)
+        line(f"Total de archivos GIFT: {self.stats.total_files}")
+        line(f"  ✅ Archivos válidos: {self.stats.valid_files}")
+        line(f"  ❌ Archivos inválidos: {self.stats.invalid_files}")
+        line(f"Total de preguntas: {self.stats.total_questions}")
+        line()
         
         # Question types
-        lines.append("📝 TIPOS DE PREGUNTAS")
-        lines.append("-" * 80)
+        line("📝 TIPOS DE PREGUNTAS")
+        line("-" * 80)
         if self.stats.by_type:
             for q_type, count in self.stats.by_type.most_common():
                 percentage = (count / self.stats.total_questions * 100) if self.stats.total_questions > 0 else 0
-                lines.append(f"  {q_type:20s}: {count:5d} ({percentage:5.1f}%)")
+                line(f"  {q_type:20s}: {count:5d} ({percentage:5.1f}%)")
         else:
-            lines.append("  No hay preguntas")
-        lines.append("")
+            line("  No hay preguntas")
+        line()
         
         # Categories
-        lines.append("📂 CATEGORÍAS")
-        lines.append("-" * 80)
+        line("📂 CATEGORÍAS")
+        line("-" * 80)
         if self.stats.by_category:
             for category, count in self.stats.by_category.most_common():
-                lines.append(f"  {category[:60]:60s}: {count:4d}")
+                line(f"  {category[:60]:60s}: {count:4d}")
         else:
-            lines.append("  No se encontraron categorías")
-        lines.append("")
+            line("  No se encontraron categorías")
+        line()
         
         # Tags
-        lines.append("🏷️  TAGS MÁS COMUNES")
-        lines.append("-" * 80)
+        line("🏷️  TAGS MÁS COMUNES")
+        line("-" * 80)
         if self.stats.by_tag:
             for tag, count in self.stats.by_tag.most_common():
-                lines.append(f"  {tag:30s}: {count:4d}")
+                line(f"  {tag:30s}: {count:4d}")
         else:
-            lines.append("  No se encontraron tags")
-        lines.append("")
+            line("  No se encontraron tags")
+        line()
         
         # Content quality
-        lines.append("✨ CALIDAD DE CONTENIDO")
-        lines.append("-" * 80)
-        lines.append(f"Preguntas con tags: {self.stats.with_tags}")
-        lines.append(f"Preguntas sin tags: {self.stats.without_tags}")
-        lines.append(f"Preguntas con feedback global: {self.stats.with_feedback}")
-        lines.append(f"Preguntas sin feedback global: {self.stats.without_feedback}")
-        lines.append(f"Preguntas vacías: {self.stats.empty_questions}")
-        lines.append("")
+        line("✨ CALIDAD DE CONTENIDO")
+        line("-" * 80)
+        line(f"Preguntas con tags: {self.stats.with_tags}")
+        line(f"Preguntas sin tags: {self.stats.without_tags}")
+        line(f"Preguntas con feedback global: {self.stats.with_feedback}")
+        line(f"Preguntas sin feedback global: {self.stats.without_feedback}")
+        line(f"Preguntas vacías: {self.stats.empty_questions}")
+        line()
         
         # Distribution by depth
-        lines.append("📁 DISTRIBUCIÓN POR PROFUNDIDAD DE DIRECTORIOS")
-        lines.append("-" * 80)
+        line("📁 DISTRIBUCIÓN POR PROFUNDIDAD DE DIRECTORIOS")
+        line("-" * 80)
         if self.stats.files_by_depth:
             for depth in sorted(self.stats.files_by_depth.keys()):
                 count = self.stats.files_by_depth[depth]
-                lines.append(f"  Nivel {depth}: {count} archivos")
-        lines.append("")
+                line(f"  Nivel {depth}: {count} archivos")
+        line()
         
         # Detected issues
         if self.issues:
-            lines.append("⚠️  PROBLEMAS DETECTADOS")
-            lines.append("-" * 80)
-            lines.append(f"Total de problemas: {len(self.issues)}")
-            lines.append("")
-            for issue in self.issues:
-                lines.append(f"  {issue}")
-            lines.append("")
+            line("⚠️  PROBLEMAS DETECTADOS")
+            line("-" * 80)
+            line(f"Total de problemas: {len(self.issues)}")
+            line()
+            # Puede haber miles: se escriben en un solo bloque
+            write("".join(f"  {issue}\n" for issue in self.issues))
+            line()
         
         # Parse errors
         if self.stats.parse_errors:
-            lines.append("❌ ERRORES DE PARSEO GIFT")
-            lines.append("-" * 80)
+            line("❌ ERRORES DE PARSEO GIFT")
+            line("-" * 80)
             for error_info in self.stats.parse_errors:
-                lines.append(f"  {error_info['filepath']}")
-                lines.append(f"    Error: {error_info['error']['message']}")
-            lines.append("")
+                line(f"  {error_info['filepath']}")
+                line(f"    Error: {error_info['error']['message']}")
+            line()
         
         # Description questions (possible issues)
         if self.descriptions:
-            lines.append("📄 PREGUNTAS TIPO DESCRIPTION (posibles problemas)")
-            lines.append("-" * 80)
-            lines.append(f"Total: {len(self.descriptions)}")
-            lines.append("Nota: Las preguntas tipo 'Description' no tienen respuestas.")
-            lines.append("      Esto puede indicar un error en el formato de la pregunta.")
-            lines.append("")
+            line("📄 PREGUNTAS TIPO DESCRIPTION (posibles problemas)")
+            line("-" * 80)
+            line(f"Total: {len(self.descriptions)}")
+            line("Nota: Las preguntas tipo 'Description' no tienen respuestas.")
+            line("      Esto puede indicar un error en el formato de la pregunta.")
+            line()
             for desc in self.descriptions:
-                lines.append(f"  📄 {desc['filepath']}")
-                lines.append(f"     Título: {desc['title']}")
+                line(f"  📄 {desc['filepath']}")
+                line(f"     Título: {desc['title']}")
                 if desc['text'] and desc['text'] != "<sin texto>":
                     text_preview = desc['text'].replace('\n', ' ')[:80]
-                    lines.append(f"     Texto: {text_preview}...")
-                lines.append("")
+                    line(f"     Texto: {text_preview}...")
+                line()
         
         # Duplicates
         if self.duplicates:
-            lines.append("🔄 PREGUNTAS DUPLICADAS O MUY SIMILARES")
-            lines.append("-" * 80)
-            lines.append(f"Total de duplicados encontrados: {len(self.duplicates)}")
-            lines.append(f"Threshold de similitud: {self.similarity_threshold}")
-            lines.append("")
+            line("🔄 PREGUNTAS DUPLICADAS O MUY SIMILARES")
+            line("-" * 80)
+            line(f"Total de duplicados encontrados: {len(self.duplicates)}")
+            line(f"Threshold de similitud: {self.similarity_threshold}")
+            line()
             
+            # Un bloque por par, armado con una sola plantilla y una escritura
+            fill = _DUPLICATE_TEMPLATE.format
             for idx, dup in enumerate(self.duplicates, 1):
                 q1 = self.all_questions[dup["index1"]]
                 q2 = self.all_questions[dup["index2"]]
-                
-                lines.append(f"Duplicado {idx}: Similitud = {dup['similarity']:.3f}")
-                lines.append(f"  Pregunta A ({q1['type']}): {q1['title'][:70]}")
-                lines.append(f"    Archivo: {q1['filepath']}")
-                lines.append(f"  Pregunta B ({q2['type']}): {q2['title'][:70]}")
-                lines.append(f"    Archivo: {q2['filepath']}")
-                lines.append(f"  Comando: meld -n '{q1['filepath']}' '{q2['filepath']}'")
-                lines.append("")
+                write(fill(
+                    idx=idx, similarity=dup["similarity"],
+                    type1=q1["type"], title1=q1["title"][:70], path1=q1["filepath"],
+                    type2=q2["type"], title2=q2["title"][:70], path2=q2["filepath"],
+                ))
         
         # Recommendations
-        lines.append("💡 RECOMENDACIONES")
-        lines.append("-" * 80)
+        line("💡 RECOMENDACIONES")
+        line("-" * 80)
         
         if self.stats.without_tags > 0:
             percentage = (self.stats.without_tags / self.stats.total_questions * 100) if self.stats.total_questions > 0 else 0
-            lines.append(f"  • {percentage:.1f}% de preguntas sin tags - considera añadir tags para mejor organización")
+            line(f"  • {percentage:.1f}% de preguntas sin tags - considera añadir tags para mejor organización")
         
         if self.stats.without_feedback > 0:
             percentage = (self.stats.without_feedback / self.stats.total_questions * 100) if self.stats.total_questions > 0 else 0
-            lines.append(f"  • {percentage:.1f}% de preguntas sin feedback global - el feedback ayuda al aprendizaje")
+            line(f"  • {percentage:.1f}% de preguntas sin feedback global - el feedback ayuda al aprendizaje")
         
         if self.stats.empty_questions > 0:
-            lines.append(f"  • {self.stats.empty_questions} preguntas vacías detectadas - requieren revisión")
+            line(f"  • {self.stats.empty_questions} preguntas vacías detectadas - requieren revisión")
         
         if self.stats.invalid_files > 0:
-            lines.append(f"  • {self.stats.invalid_files} archivos con errores - necesitan corrección")
+            line(f"  • {self.stats.invalid_files} archivos con errores - necesitan corrección")
         
         if self.duplicates:
-            lines.append(f"  • {len(self.duplicates)} preguntas duplicadas detectadas - considera revisar para eliminar redundancias")
+            line(f"  • {len(self.duplicates)} preguntas duplicadas detectadas - considera revisar para eliminar redundancias")
         
         if not self.issues and not self.stats.parse_errors and not self.duplicates:
-            lines.append("  • ¡Todo se ve bien! No se detectaron problemas significativos")
-        
-        lines.append("")
-        lines.append("=" * 80)
-        
-        report = "\n".join(lines)
+            line("  • ¡Todo se ve bien! No se detectaron problemas significativos")
         
-        if output_file:
-            Path(output_file).write_text(report, encoding='utf-8')
-            print(f"\n✅ Informe guardado en: {output_file}")
-        
-        return report
+        line()
+        # Sin salto de línea final, como el informe unido con "\n".join
+        write("=" * 80)
+    
+    def _question_ref(self, index: int) -> dict:
+        """Datos de una pregunta para el JSON de duplicados."""
+        q = self.all_questions[index]
+        return {"filepath": q["filepath"], "title": q["title"], "type": q["type"]}
     
     def to_json(self) -> dict:
         """Convert analysis results to JSON-serializable dict."""
@@ -543,16 +737,8 @@ class GiftAnalyzer:
             "duplicates": [
                 {
                     "similarity": d["similarity"],
-                    "question1": {
-                        "filepath": self.all_questions[d["index1"]]["filepath"],
-                        "title": self.all_questions[d["index1"]]["title"],
-                        "type": self.all_questions[d["index1"]]["type"]
-                    },
-                    "question2": {
-                        "filepath": self.all_questions[d["index2"]]["filepath"],
-                        "title": self.all_questions[d["index2"]]["title"],
-                        "type": self.all_questions[d["index2"]]["type"]
-                    }
+                    "question1": self._question_ref(d["index1"]),
+                    "question2": self._question_ref(d["index2"])
                 }
                 for d in self.duplicates
             ],
@@ -626,8 +812,6 @@ Ejemplos:
             report = analyzer.generate_report(args.output)
             if not args.output:
                 print(report)
-            else:
-                print(report)
     
     except KeyboardInterrupt:
         print("\n⚠️  Análisis interrumpido por el usuario")
@@ -1,41 +1,252 @@
+import mmap
+import os
 import re
+import unicodedata
 import xml.etree.ElementTree as ET
+from collections import Counter
 from pathlib import Path
+from typing import AnyStr, Optional
+
+from questions.core.files import write_bytes_atomic
+
+# Marcadores de los bloques <text>, en str y en bytes (todos ASCII)
+_TEXT_MARKERS = {
+    str: ('<text', '>', '</text>', '<![CDATA[', ']]>'),
+    bytes: (b'<text', b'>', b'</text>', b'<![CDATA[', b']]>'),
+}
+
+# Versiones de la lógica detrás de las cachés de xml clean-tags y rename;
+# hay que subirlas cuando cambie la detección de <tags> o el cálculo del nombre.
+CLEAN_TAGS_CACHE_VERSION = 1
+QUESTION_NAME_CACHE_VERSION = 1
+
+# Tamaño de cada lectura al buscar el nombre de la pregunta
+_NAME_READ_SIZE = 1 << 16
+
+_FILENAME_BAD_CHARS_RE = re.compile(r'[^\w\s-]')
+_FILENAME_SEPARATORS_RE = re.compile(r'[-\s]+')
+
+def _markers(xml_content) -> tuple:
+    # bytes, bytearray o mmap usan los marcadores en bytes
+    return _TEXT_MARKERS[str if isinstance(xml_content, str) else bytes]
+
+def _iter_text_blocks(xml_content: AnyStr):
+    """
+    Produce (inicio, fin) del contenido de cada bloque <text ...>...</text>.
+
+    Los delimitadores son literales, así que alcanza con find; equivale
+    a recorrer (<text[^>]*>)(.*?)(</text>) con DOTALL.
+    """
+    open_tag, gt, close_tag = _markers(xml_content)[:3]
+    pos = 0
+    while True:
+        start = xml_content.find(open_tag, pos)
+        if start == -1:
+            return
+        open_end = xml_content.find(gt, start + 5)
+        if open_end == -1:
+            return
+        close = xml_content.find(close_tag, open_end + 1)
+        if close == -1:
+            return
+        yield open_end + 1, close
+        pos = close + 7
 
 def sanitize_filename(text: str, max_length: int = 100) -> str:
     """Sanitiza un texto para usarlo como nombre de archivo."""
+    # Quitar acentos: NFKD separa las marcas combinantes y se descartan solo
+    # esas; las letras sin equivalente ASCII (ß, Ø, cirílico...) se conservan
+    text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
     # Reemplazar caracteres no alfanuméricos por guiones bajos
-    s = re.sub(r'[^\w\s-]', '', text).strip()
-    s = re.sub(r'[-\s]+', '_', s)
+    s = _FILENAME_BAD_CHARS_RE.sub('', text).strip()
+    s = _FILENAME_SEPARATORS_RE.sub('_', s)
     return s[:max_length].lower()
 
-def ensure_cdata_in_text_blocks(xml_content: str) -> tuple[str, int]:
-    """Asegura que todos los bloques <text> tengan su contenido envuelto en CDATA."""
+def _is_suffixed_name(candidate: str, stem: str, suffix: str) -> bool:
+    # candidate es stem_N + suffix (p. ej. q_1.xml para q.xml)
+    candidate, stem, suffix = map(os.path.normcase, (candidate, stem, suffix))
+    if not (candidate.startswith(stem + "_") and candidate.endswith(suffix)):
+        return False
+    number = candidate[len(stem) + 1:len(candidate) - len(suffix)]
+    return number.isascii() and number.isdigit()
+
+def unique_file_name(name: str, taken: set, last_suffix: Optional[Counter] = None,
+                     current: Optional[str] = None) -> str:
+    """
+    Devuelve name, o name con sufijo _1, _2, ... si ya está en taken.
+
+    taken es el conjunto de nombres ocupados del directorio; se consulta en
+    memoria en lugar de preguntar al sistema de archivos por cada candidato.
+    last_suffix recuerda el último sufijo usado por nombre, así k colisiones
+    del mismo nombre no vuelven a probar desde _1 cada vez. current es el
+    nombre actual del archivo: si ya es una variante con sufijo de name
+    (q_1.xml), se conserva.
+    """
+    if name not in taken:
+        return name
+    stem, suffix = os.path.splitext(name)
+    if current is not None and _is_suffixed_name(current, stem, suffix):
+        return current
+    if last_suffix is None:
+        last_suffix = Counter()
+    counter = last_suffix[name] + 1
+    while f"{stem}_{counter}{suffix}" in taken:
+        counter += 1
+    last_suffix[name] = counter
+    return f"{stem}_{counter}{suffix}"
+
+def _is_blank(chunk) -> bool:
+    # bytes.isspace solo reconoce espacios ASCII: si hay bytes no ASCII
+    # (NBSP, U+3000...) se decodifica para usar la misma regla que str.strip()
+    if not isinstance(chunk, str) and not chunk.isascii():
+        chunk = chunk.decode('utf-8', 'replace')
+    return not chunk or chunk.isspace()
+
+def _needs_cdata(content, cdata_open) -> bool:
+    # Equivale a strip() + startswith() sin copiar el bloque
+    if _is_blank(content):
+        return False
+    idx = content.find(cdata_open)
+    return idx != 0 and (idx == -1 or not _is_blank(content[:idx]))
+
+def count_unwrapped_text_blocks(xml_content: AnyStr) -> int:
+    """Cuenta los bloques <text> sin CDATA, sin construir el contenido nuevo."""
+    cdata_open = _markers(xml_content)[3]
+    return sum(1 for start, end in _iter_text_blocks(xml_content)
+               if _needs_cdata(xml_content[start:end], cdata_open))
+
+def ensure_cdata_in_text_blocks(xml_content: AnyStr) -> tuple[AnyStr, int]:
+    """
+    Asegura que todos los bloques <text> tengan su contenido envuelto en CDATA.
+
+    Acepta str o bytes (también un mmap); con bytes se evita decodificar el
+    archivo, ya que todos los marcadores son ASCII.
+    """
     # Buscar bloques <text> que no tengan CDATA
     # <text>contenido</text> -> <text><![CDATA[contenido]]></text>
+    _, _, close_tag, cdata_open, cdata_close = _markers(xml_content)
+    if xml_content.find(close_tag) == -1:
+        return xml_content, 0
+
     count = 0
-    def replace_text(match):
-        nonlocal count
-        start_tag = match.group(1)
-        content = match.group(2)
-        end_tag = match.group(3)
-        
-        if content.strip() and not content.strip().startswith('<![CDATA['):
+    parts = []
+    last = 0
+    for start, end in _iter_text_blocks(xml_content):
+        content = xml_content[start:end]
+        if _needs_cdata(content, cdata_open):
             count += 1
-            return f"{start_tag}<![CDATA[{content}]]>{end_tag}"
-        return match.group(0)
+            parts.append(xml_content[last:start])
+            parts.append(cdata_open)
+            parts.append(content)
+            parts.append(cdata_close)
+            last = end
+
+    if not count:
+        return xml_content, 0
+    parts.append(xml_content[last:])
+    return xml_content[:0].join(parts), count
 
-    # Regex para capturar <text>...</text> considerando atributos
-    pattern = r'(<text[^>]*>)(.*?)(</text>)'
-    new_content = re.sub(pattern, replace_text, xml_content, flags=re.DOTALL)
-    return new_content, count
+def ensure_cdata_in_file(file_path: Path, dry_run: bool = False) -> int:
+    """
+    Aplica ensure_cdata_in_text_blocks a un archivo y lo reescribe si hubo
+    cambios. Devuelve la cantidad de bloques actualizados.
+
+    Con dry_run el archivo se mapea en memoria y solo se cuentan los bloques,
+    sin copiarlo ni modificarlo.
+    """
+    if dry_run:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return count_unwrapped_text_blocks(mm)
+
+    content = file_path.read_bytes()
+    # Si cada <text> abre directamente un CDATA no hay nada que envolver
+    if content.count(b'<text') == content.count(b'<text><![CDATA['):
+        return 0
+    new_content, count = ensure_cdata_in_text_blocks(content)
+    if count > 0:
+        write_bytes_atomic(file_path, new_content)
+    return count
 
 def remove_tags_from_xml(root: ET.Element) -> int:
     """Elimina las secciones <tags> de todas las preguntas."""
     count = 0
-    for question in root.findall('.//question'):
+    for question in root.findall('question'):
         tags = question.find('tags')
         if tags is not None:
             question.remove(tags)
             count += 1
     return count
+
+def remove_tags_from_file(file_path: Path, dry_run: bool = False) -> int:
+    """
+    Elimina las secciones <tags> de un archivo XML de Moodle.
+
+    Detectar y quitar es la misma pasada sobre un único parseo; el archivo
+    solo se reescribe si había tags y no es dry_run. Devuelve cuántas
+    secciones había.
+
+    La escritura es atómica (temporal + os.replace), como en cdata: un fallo
+    a mitad de camino no deja el XML truncado.
+    """
+    # Sin el literal <tags no hay nada que quitar: se evita el parseo. Si
+    # está, el parser se alimenta desde el mismo mapeo.
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'<tags') == -1:
+                return 0
+            parser = ET.XMLParser()
+            parser.feed(mm)
+            root = parser.close()
+    count = remove_tags_from_xml(root)
+    if count > 0 and not dry_run:
+        write_bytes_atomic(file_path, ET.tostring(root, encoding='utf-8', xml_declaration=True))
+    return count
+
+def question_name(file_path: Path) -> Optional[str]:
+    """
+    Texto del primer question/name/text de un XML de Moodle.
+
+    El archivo se le pasa a un XMLPullParser en bloques de 64 KB y la
+    lectura se corta en cuanto aparece el nombre; cada pregunta ya procesada
+    se libera, así no se arma el árbol completo del archivo.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    path = []
+
+    def find_name():
+        for event, elem in parser.read_events():
+            if event == 'start':
+                path.append(elem.tag)
+                continue
+            if len(path) == 4 and path[1:] == ['question', 'name', 'text']:
+                return elem.text or ''
+            path.pop()
+            if len(path) == 1 and elem.tag == 'question':
+                elem.clear()
+        return None
+
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(_NAME_READ_SIZE):
+            parser.feed(chunk)
+            name = find_name()
+            if name is not None:
+                return name
+    parser.close()
+    return find_name()
+
+def question_file_name(file_path: Path) -> Optional[str]:
+    """
+    Nombre de archivo (sanitizado, con .xml) que corresponde a la pregunta
+    del XML, o None si no tiene nombre.
+    """
+    name = question_name(file_path)
+    stem = sanitize_filename(name) if name else ""
+    # Un nombre solo de símbolos queda vacío: no hay a qué renombrar
+    if not stem:
+        return None
+    return stem + ".xml"
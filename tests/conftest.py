@@ -0,0 +1,11 @@
+import pytest
+
+@pytest.fixture
+def write_file(tmp_path):
+    """Crea un archivo UTF-8 bajo tmp_path (con sus directorios) y devuelve la ruta."""
+    def write(name, content=""):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+        return path
+    return write
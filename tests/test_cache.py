@@ -0,0 +1,41 @@
+import json
+import os
+
+from questions.core.cache import FileCache
+
+def test_file_cache_invalidates_on_change(tmp_path, write_file):
+    f = write_file("q.gift", "uno")
+
+    cache = FileCache("test", cache_dir=tmp_path / "cache")
+    assert cache.get(f) is None
+    cache.set(f, {"blocks": 2})
+    cache.save()
+
+    reloaded = FileCache("test", cache_dir=tmp_path / "cache")
+    assert reloaded.get(f) == {"blocks": 2}
+
+    f.write_text("uno dos")
+    os.utime(f, ns=(0, 0))
+    assert reloaded.get(f) is None
+
+def test_file_cache_discards_other_version(tmp_path, write_file):
+    f = write_file("q.gift", "uno")
+
+    cache = FileCache("test", cache_dir=tmp_path / "cache", version=1)
+    cache.set(f, True)
+    cache.save()
+
+    assert FileCache("test", cache_dir=tmp_path / "cache", version=1).get(f) is True
+    assert FileCache("test", cache_dir=tmp_path / "cache", version=2).get(f) is None
+
+def test_file_cache_prunes_missing_files(tmp_path, write_file):
+    kept, gone = write_file("a.gift", "a"), write_file("b.gift", "b")
+
+    cache = FileCache("test", cache_dir=tmp_path / "cache")
+    cache.set(kept, 1)
+    cache.set(gone, 2)
+    gone.unlink()
+    cache.save()
+
+    data = json.loads((tmp_path / "cache" / "test.json").read_text())
+    assert list(data["entries"]) == [os.path.abspath(kept)]
@@ -1,5 +1,6 @@
 from click.testing import CliRunner
 from questions.cli import cli
+from questions.core import cache
 from pathlib import Path
 
 def test_cli_help():
@@ -57,3 +58,79 @@ def test_cli_ai_prompt_file(tmp_path):
     # It might fail due to missing API key, but we can verify it tried to load the prompt
     # or just check that it didn't crash on argument parsing.
     assert result.exit_code == 0 or "GEMINI_API_KEY" in result.output
+
+def test_cli_fix_code_chars_server(tmp_path, write_file):
+    f = write_file("q.gift", "Q `a⩵b`")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['fix', 'code-chars', '--server'],
+                           input=f"{f}\n{tmp_path / 'falta.gift'}\n")
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[0] == "OK 1"
+    assert lines[1].startswith("ERROR")
+    assert f.read_text(encoding='utf-8') == "Q `a==b`"
+
+def test_cli_fix_code_chars_server_rejects_batch_options(tmp_path):
+    runner = CliRunner()
+    for extra in ([str(tmp_path)], ['--cache'], ['--jobs', '2']):
+        result = runner.invoke(cli, ['fix', 'code-chars', '--server', *extra], input="")
+        assert result.exit_code == 2
+        assert "--server no admite" in result.output
+
+def test_cli_convert_html_to_md(tmp_path, write_file):
+    for i in range(3):
+        write_file(f"q{i}.gift", f"<b>Q{i}</b>{{=A}}")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['convert', 'html-to-md', str(tmp_path)])
+    assert result.exit_code == 0
+    assert result.output.count("✓") == 3
+    assert "3 archivos modificados" in result.output
+
+def test_cli_xml_rename_is_idempotent(tmp_path, write_file):
+    for name in ("q.xml", "q_1.xml", "q_2.xml", "a.xml"):
+        write_file(f"xml/{name}", "<quiz><question><name><text>q</text></name></question></quiz>")
+    d = tmp_path / "xml"
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['xml', 'rename', str(d)])
+    assert result.exit_code == 0
+    assert result.output.count("->") == 1
+    assert sorted(p.name for p in d.iterdir()) == ["q.xml", "q_1.xml", "q_2.xml", "q_3.xml"]
+
+    result = runner.invoke(cli, ['xml', 'rename', str(d)])
+    assert result.exit_code == 0
+    assert "->" not in result.output
+
+def test_cli_xml_rename_cache(tmp_path, write_file, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "cache")
+    d = write_file("xml/a.xml", "<quiz><question><name><text>Q</text></name></question></quiz>").parent
+    write_file("xml/b.xml", "<quiz><question><name><text>Q</text></name></question></quiz>")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['xml', 'rename', '--cache', str(d)])
+    assert result.exit_code == 0
+    assert sorted(p.name for p in d.iterdir()) == ["q.xml", "q_1.xml"]
+
+    # Segunda pasada: los nombres salen de la caché y no hay nada que mover
+    result = runner.invoke(cli, ['xml', 'rename', '--cache', str(d)])
+    assert result.exit_code == 0
+    assert "->" not in result.output
+    assert sorted(p.name for p in d.iterdir()) == ["q.xml", "q_1.xml"]
+
+def test_cli_jobs_must_be_positive(tmp_path):
+    runner = CliRunner()
+    for value in ("0", "-1"):
+        result = runner.invoke(cli, ['validate', '--jobs', value, str(tmp_path)])
+        assert result.exit_code == 2
+        assert "--jobs" in result.output
+
+def test_cli_xml_clean_tags_counts_errors(tmp_path, write_file):
+    write_file("xml/a.xml", "<quiz><question><tags><tag><text>t</text></tag></tags></question></quiz>")
+    write_file("xml/b.xml", "<quiz><question></quiz><tags>")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['xml', 'clean-tags', str(tmp_path / "xml")])
+    assert result.exit_code == 0
+    assert "1 archivos revisados, 1 con tags, 1 con errores" in result.output
@@ -1,4 +1,6 @@
-from questions.core.converter import convert_html_tags_to_markdown
+from questions.core.converter import (
+    convert_html_file_to_markdown, convert_html_tags_to_markdown, convert_xml_html_to_markdown,
+)
 
 def test_convert_html_tags_to_markdown():
     html = "<code>code</code> <p>para</p> <strong>bold</strong>"
@@ -14,3 +16,24 @@ def test_convert_fullwidth_html_tags():
     
     assert "`code`" in md
     assert "para" in md
+
+def test_convert_nested_html_tags():
+    html = "<p>Usa <code>x<br>y</code> y <b>nota</b></p><pre><code>z</code></pre>"
+    md = convert_html_tags_to_markdown(html)
+
+    assert md == "Usa `x\ny` y **nota**\n```\n`z`\n```"
+
+def test_convert_mixed_fullwidth_and_html_tags():
+    # Los fullwidth se convierten antes que los normales, aunque estén por fuera
+    assert convert_html_tags_to_markdown("<p>＜code＞<p>x</p>＜/code＞</p>") == "`<p>x\n`</p>"
+    assert convert_html_tags_to_markdown("<p>a<p>b</p>c</p>") == "a<p>b\nc</p>"
+
+def test_convert_xml_html_to_markdown():
+    xml = '<text format="html"><![CDATA[<p>Hola <b>mundo</b></p>]]></text>'
+    assert convert_xml_html_to_markdown(xml) == '<text format="markdown"><![CDATA[Hola **mundo**]]></text>'
+
+def test_convert_html_file_to_markdown(write_file):
+    f = write_file("q.gift", "<b>Q</b>{=A}")
+    assert convert_html_file_to_markdown(f) is True
+    assert f.read_text(encoding='utf-8') == "**Q**{=A}"
+    assert convert_html_file_to_markdown(f) is False
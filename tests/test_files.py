@@ -0,0 +1,64 @@
+from questions.core.files import write_text_atomic, write_bytes_atomic, map_files, collect_files, MIN_PARALLEL_FILES
+from questions.core.formatter import convert_code_chars_in_file
+
+def test_write_text_atomic(tmp_path, write_file):
+    f = write_file("q.gift", "old")
+    f.chmod(0o644)
+
+    write_text_atomic(f, "new ⩵")
+
+    assert f.read_text(encoding='utf-8') == "new ⩵"
+    assert f.stat().st_mode & 0o777 == 0o644
+    assert [p.name for p in tmp_path.iterdir()] == ["q.gift"]
+
+def test_write_text_atomic_through_symlink(tmp_path, write_file):
+    target = write_file("real.gift", "old")
+    link = tmp_path / "link.gift"
+    link.symlink_to(target)
+
+    write_text_atomic(link, "new")
+
+    assert link.is_symlink()
+    assert target.read_text(encoding='utf-8') == "new"
+
+def test_map_files_parallel_keeps_order(tmp_path, write_file):
+    files = [write_file(f"q{i:02}.gift", "Usa `a⩵b`" if i % 2 else "sin código")
+             for i in range(MIN_PARALLEL_FILES + 2)]
+    files.append(tmp_path / "falta.gift")
+
+    results = list(map_files(convert_code_chars_in_file, files, True, jobs=2))
+
+    assert [r[0] for r in results] == files
+    assert [r[1] for r in results[:-1]] == [i % 2 for i in range(MIN_PARALLEL_FILES + 2)]
+    assert results[-1][1] is None and results[-1][2]
+    assert files[1].read_text(encoding='utf-8') == "Usa `a==b`"
+
+def test_collect_files_single_walk(tmp_path, write_file):
+    for name in ("a.gift", "b.XML", "c.txt", "sub/d.md"):
+        write_file(name)
+
+    found = collect_files([str(tmp_path)], ('.gift', '.xml', '.md'), recursive=False)
+    assert sorted(f.name for f in found) == ["a.gift", "b.XML"]
+
+    found = collect_files([str(tmp_path)], ('.gift', '.xml', '.md'), recursive=True)
+    assert sorted(f.name for f in found) == ["a.gift", "b.XML", "d.md"]
+
+def test_write_bytes_atomic(tmp_path):
+    f = tmp_path / "q.xml"
+    write_bytes_atomic(f, b"<quiz/>\r\n")
+
+    assert f.read_bytes() == b"<quiz/>\r\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["q.xml"]
+
+def test_map_files_consumes_generator_lazily(tmp_path):
+    seen = []
+
+    def paths():
+        for i in range(3):
+            seen.append(i)
+            yield tmp_path / f"falta{i}.gift"
+
+    results = map_files(convert_code_chars_in_file, paths(), True, jobs=1)
+    next(results)
+    assert seen == [0]
+    assert len(list(results)) == 2
@@ -1,4 +1,6 @@
-from questions.core.formatter import format_gift_content, fix_code_indentation, convert_markdown_code_blocks
+from questions.core.formatter import (
+    format_gift_content, fix_code_indentation, convert_markdown_code_blocks, convert_code_block_content,
+)
 
 def test_format_gift_content():
     content = "::Title::Question{=Ans~Wrong}"
@@ -28,3 +30,21 @@ def test_convert_markdown_code_blocks():
     normal, count = convert_markdown_code_blocks(converted, to_normal=True)
     assert count == 1
     assert "x == y" in normal
+
+def test_convert_code_block_content_multichar_keys():
+    assert convert_code_block_content("a ⩵ b＆c", to_normal=True) == "a == b&#38;c"
+    assert convert_code_block_content("    x = 1", to_normal=True) == "\tx = 1"
+    assert convert_code_block_content("a === b &lt; c", to_normal=False) == "a ⩵＝ b ＜ c"
+
+def test_convert_markdown_code_blocks_unchanged_is_verbatim():
+    content = "Texto\n```python\nprint(1)\n```\ny `x`"
+    converted, count = convert_markdown_code_blocks(content, to_normal=True)
+    assert count == 0
+    assert converted == content
+
+def test_convert_markdown_code_blocks_single_pass():
+    content = "```\nx⩵y\n```＝`a⩵b`"
+    converted, count = convert_markdown_code_blocks(content, to_normal=True)
+    assert count == 2
+    # El texto entre el cierre del bloque y el inline no es código
+    assert converted == "```\nx==y\n\n```＝`a==b`"
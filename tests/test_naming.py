@@ -33,3 +33,11 @@ def test_get_set_xml_title(tmp_path):
     set_question_title(f, "New XML Title")
     assert get_question_title(f) == "New XML Title"
     assert "<text>New XML Title</text>" in f.read_text()
+
+def test_get_question_title_xml_skips_category(write_file):
+    f = write_file(
+        "q.xml",
+        '<quiz><question type="category"><category><text>$course$/A</text></category></question>'
+        '<question type="multichoice"><name><text> Segunda </text></name></question></quiz>'
+    )
+    assert get_question_title(f) == "Segunda"
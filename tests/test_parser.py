@@ -1,5 +1,5 @@
 import pytest
-from questions.core.parser import parse_gift_file
+from questions.core.parser import parse_gift_file, GiftSemantics
 
 def test_parse_simple_gift(tmp_path):
     gift_content = "::Title:: Question {=Ans ~Wrong}"
@@ -23,3 +23,8 @@ def test_parse_multiple_questions(tmp_path):
     assert result["questionCount"] == 2
     assert result["questions"][0]["title"] == "Q1"
     assert result["questions"][1]["title"] == "Q2"
+
+def test_decode_escapes():
+    decode = GiftSemantics()._decode_escapes
+    assert decode(r"a\:b \= \{x\} \~ \# \\ y\nz") == "a:b = {x} ~ # \\ y\nz"
+    assert decode(r"\\:") == "\\:"
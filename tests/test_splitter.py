@@ -13,3 +13,11 @@ def test_split_file(tmp_path):
     assert (tmp_path / "q1.gift").exists()
     assert (tmp_path / "q2.gift").exists()
     assert (tmp_path / "q1.gift").read_text().strip() == "::Q1::\nText 1{=A}"
+
+def test_split_file_symbol_only_title(write_file):
+    f = write_file("test.gift", "::¿?::\nText 1{=A}\n\n::Вопрос::\nText 2{=B}")
+
+    assert split_file(f) == 2
+    assert (f.parent / "test_1.gift").exists()
+    assert (f.parent / "вопрос.gift").exists()
+    assert not (f.parent / ".gift").exists()
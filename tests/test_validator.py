@@ -1,3 +1,6 @@
+from questions.core import validator
+from questions.core.cache import FileCache
+from questions.core.files import MIN_PARALLEL_FILES
 from questions.core.validator import GiftAnalyzer
 from pathlib import Path
 
@@ -24,3 +27,110 @@ def test_analyzer_duplicates(tmp_path):
     analyzer.find_duplicates()
     
     assert len(analyzer.duplicates) == 1
+
+def test_find_duplicates_matches_all_pairs():
+    texts = ["suma de dos enteros", "suma de dos enteros positivos", "resta de dos enteros",
+             "lista enlazada simple", "lista enlazada doble", "suma de dos enteros",
+             "", "árbol binario de búsqueda"]
+    analyzer = GiftAnalyzer(similarity_threshold=0.7, min_tokens=0)
+    analyzer.all_questions = [
+        {"filepath": f"q{i}.gift", "type": "MC", "title": f"Q{i}", "full_text": t}
+        for i, t in enumerate(texts)
+    ]
+    analyzer.find_duplicates()
+
+    # Con threshold 0 se comparan todos los pares
+    brute = GiftAnalyzer(similarity_threshold=0.0, min_tokens=0)
+    brute.all_questions = analyzer.all_questions
+    brute.find_duplicates()
+    assert len(brute.duplicates) == len(texts) * (len(texts) - 1) // 2
+    expected = {(d["index1"], d["index2"]) for d in brute.duplicates if d["similarity"] >= 0.7}
+    assert {(d["index1"], d["index2"]) for d in analyzer.duplicates} == expected
+    assert (0, 5) in expected
+    assert "vector" not in analyzer.all_questions[0]
+
+def test_find_duplicates_exact_copies():
+    texts = ["Suma de dos enteros", "suma  de dos enteros!", "lista enlazada simple", "suma de dos enteros",
+             "árbol binario balanceado", "pila y cola", "grafo dirigido acíclico"]
+    analyzer = GiftAnalyzer(similarity_threshold=0.9)
+    analyzer.all_questions = [
+        {"filepath": f"q{i}.gift", "type": "MC", "title": f"Q{i}", "full_text": t}
+        for i, t in enumerate(texts)
+    ]
+    analyzer.find_duplicates()
+
+    assert [(d["index1"], d["index2"]) for d in analyzer.duplicates] == [(0, 1), (0, 3), (1, 3)]
+
+    # Las copias exactas llegan a 1.0 sin errores de redondeo
+    analyzer.similarity_threshold = 1.0
+    analyzer.find_duplicates()
+    assert [(d["index1"], d["index2"]) for d in analyzer.duplicates] == [(0, 1), (0, 3), (1, 3)]
+
+def test_find_duplicates_skips_short_texts():
+    texts = ["int", "int", "suma de dos enteros", "suma de dos enteros", "lista enlazada simple",
+             "árbol binario balanceado", "pila y cola"]
+    analyzer = GiftAnalyzer(similarity_threshold=0.9)
+    analyzer.all_questions = [
+        {"filepath": f"q{i}.gift", "type": "MC", "title": f"Q{i}", "full_text": t}
+        for i, t in enumerate(texts)
+    ]
+    analyzer.find_duplicates()
+
+    assert [(d["index1"], d["index2"]) for d in analyzer.duplicates] == [(2, 3)]
+
+def test_analyzer_parallel_scan(tmp_path, write_file):
+    for i in range(MIN_PARALLEL_FILES + 2):
+        write_file(f"q{i:02}.gift", f"::Q{i}:: Pregunta {i} {{=A ~B}}")
+
+    serial = GiftAnalyzer(recursive=False, jobs=1)
+    serial.scan_directory(str(tmp_path))
+    parallel = GiftAnalyzer(recursive=False, jobs=2)
+    parallel.scan_directory(str(tmp_path))
+
+    assert parallel.stats.total_questions == MIN_PARALLEL_FILES + 2
+    assert parallel.all_questions == serial.all_questions
+
+def test_mc_without_correct_answer(tmp_path, write_file):
+    write_file("q1.gift", "::Q1:: Texto {~A ~B =C}")
+    write_file("q2.gift", "::Q2:: Texto {~A ~%50%B =C}")
+    write_file("q3.gift", "::Q3:: Texto {~%50%A ~%50%B ~C}")
+    write_file("q4.gift", "::Q4:: Texto {~%50%A ~B ~C}")
+
+    analyzer = GiftAnalyzer(recursive=False)
+    analyzer.scan_directory(str(tmp_path))
+
+    flagged = [i for i in analyzer.issues if "sin respuesta correcta" in i]
+    assert len(flagged) == 1 and "Q4" in flagged[0]
+
+def test_generate_report_to_file(tmp_path, write_file):
+    write_file("q1.gift", "::Q1:: Texto {=A ~B}")
+    analyzer = GiftAnalyzer(recursive=False)
+    analyzer.scan_directory(str(tmp_path))
+
+    report = analyzer.generate_report()
+    out = tmp_path / "informe.txt"
+    assert analyzer.generate_report(str(out)) is None
+    assert out.read_text(encoding='utf-8') == report
+
+def test_analyzer_parse_cache(tmp_path, write_file, monkeypatch):
+    src = write_file("preguntas/q1.gift", "::Q1:: Texto [tag1] {=A ~B}").parent
+    write_file("preguntas/q2.gift", "::Q2:: Otro {T}")
+
+    first = GiftAnalyzer(recursive=False, cache=FileCache("gift-parse", tmp_path / "cache"))
+    first.scan_directory(str(src))
+
+    def fail(path):
+        raise AssertionError("no debería parsear")
+    monkeypatch.setattr(validator, "parse_gift_file", fail)
+    second = GiftAnalyzer(recursive=False, cache=FileCache("gift-parse", tmp_path / "cache"))
+    second.scan_directory(str(src))
+
+    assert second.all_questions == first.all_questions
+    assert second.stats == first.stats
+
+def test_compute_idf_prunes_vocabulary():
+    token_sets = [{"de", "suma", "int"}, {"de", "suma"}, {"de", "lista"}, {"de", "lista", "árbol"}]
+
+    assert set(GiftAnalyzer()._compute_idf(token_sets)) == {"de", "suma", "int", "lista", "árbol"}
+    pruned = GiftAnalyzer(min_df=2, max_df=0.9)._compute_idf(token_sets)
+    assert set(pruned) == {"suma", "lista"}
@@ -1,5 +1,10 @@
 import xml.etree.ElementTree as ET
-from questions.core.xml_tools import ensure_cdata_in_text_blocks, remove_tags_from_xml
+from collections import Counter
+from questions.core.xml_tools import (
+    count_unwrapped_text_blocks, ensure_cdata_in_file, ensure_cdata_in_text_blocks,
+    question_file_name, question_name, remove_tags_from_file, remove_tags_from_xml,
+    sanitize_filename, unique_file_name,
+)
 
 def test_ensure_cdata():
     xml_content = "<question><text>Content</text></question>"
@@ -20,3 +25,92 @@ def test_remove_tags():
     
     assert count == 1
     assert root.find('.//tags') is None
+
+def test_ensure_cdata_skips_unicode_space_prefix():
+    xml_content = "<text>\u00a0<![CDATA[A]]></text><text>\u3000<![CDATA[B]]></text><text>\u00a0</text>"
+    for content in (xml_content, xml_content.encode('utf-8')):
+        new_content, count = ensure_cdata_in_text_blocks(content)
+        assert count == 0
+        assert new_content == content
+
+def test_ensure_cdata_in_file(write_file):
+    f = write_file("q.xml", "<quiz><text>A</text><text><![CDATA[B]]></text></quiz>")
+    assert ensure_cdata_in_file(f) == 1
+    assert f.read_text(encoding='utf-8') == "<quiz><text><![CDATA[A]]></text><text><![CDATA[B]]></text></quiz>"
+    assert ensure_cdata_in_file(f) == 0
+
+def test_ensure_cdata_bytes():
+    new_content, count = ensure_cdata_in_text_blocks("<text>Ñandú</text><text> </text>".encode('utf-8'))
+
+    assert count == 1
+    assert new_content == "<text><![CDATA[Ñandú]]></text><text> </text>".encode('utf-8')
+
+def test_ensure_cdata_in_file_dry_run(write_file):
+    f = write_file("q.xml", "<quiz><text>A</text><text>B</text></quiz>")
+    empty = write_file("vacio.xml")
+
+    assert ensure_cdata_in_file(f, dry_run=True) == 2
+    assert f.read_text(encoding='utf-8') == "<quiz><text>A</text><text>B</text></quiz>"
+    assert ensure_cdata_in_file(empty, dry_run=True) == 0
+
+def test_count_unwrapped_text_blocks():
+    xml_content = "<text>A</text><text> <![CDATA[B]]></text><text>\n</text><text format='x'>C</text>"
+    assert count_unwrapped_text_blocks(xml_content) == 2
+    assert count_unwrapped_text_blocks(xml_content.encode()) == 2
+
+def test_remove_tags_from_file(write_file):
+    original = "<quiz><question><tags><tag><text>t1</text></tag></tags></question></quiz>"
+    f = write_file("q.xml", original)
+    assert remove_tags_from_file(f, dry_run=True) == 1
+    assert f.read_text(encoding='utf-8') == original
+    assert remove_tags_from_file(f) == 1
+    assert "<tags>" not in f.read_text(encoding='utf-8')
+
+    mtime = f.stat().st_mtime_ns
+    assert remove_tags_from_file(f) == 0
+    assert f.stat().st_mtime_ns == mtime
+
+    # Sin <tags> ni siquiera se parsea (el archivo está mal formado)
+    broken = write_file("broken.xml", "<quiz><question>")
+    assert remove_tags_from_file(broken) == 0
+
+def test_question_file_name(write_file):
+    f = write_file("q.xml", "<quiz><question><name><text>Mi Pregunta 1</text></name></question></quiz>")
+    assert question_file_name(f) == "mi_pregunta_1.xml"
+
+    f = write_file("q.xml", "<quiz><question><name><text>日本</text></name></question></quiz>")
+    assert question_file_name(f) == "日本.xml"
+
+    f = write_file("q.xml", "<quiz><question><name><text>¿?!</text></name></question></quiz>")
+    assert question_file_name(f) is None
+
+    f = write_file("q.xml", "<quiz><question><name><text></text></name></question></quiz>")
+    assert question_file_name(f) is None
+
+def test_sanitize_filename():
+    assert sanitize_filename("Ñandú: ¿qué es?") == "nandu_que_es"
+    assert sanitize_filename("a - b") == "a_b"
+    assert sanitize_filename("Вопрос 1") == "вопрос_1"
+    assert sanitize_filename("Straße Øresund") == "straße_øresund"
+    assert sanitize_filename("¿?!") == ""
+
+def test_unique_file_name():
+    assert unique_file_name("a.xml", {"b.xml"}) == "a.xml"
+    assert unique_file_name("a.xml", {"a.xml", "a_1.xml"}) == "a_2.xml"
+
+    taken, last_suffix = {"a.xml"}, Counter()
+    for expected in ("a_1.xml", "a_2.xml", "a_3.xml"):
+        new_name = unique_file_name("a.xml", taken, last_suffix)
+        assert new_name == expected
+        taken.add(new_name)
+    assert last_suffix["a.xml"] == 3
+
+    # El nombre actual, si ya es una variante con sufijo, se conserva
+    assert unique_file_name("a.xml", taken, last_suffix, current="a_1.xml") == "a_1.xml"
+    assert unique_file_name("a.xml", taken, last_suffix, current="b.xml") == "a_4.xml"
+
+def test_question_name_stops_at_first_name(write_file):
+    # Lo que sigue al nombre está mal formado: no se llega a leer
+    f = write_file("q.xml", "<quiz><question type='category'><category><text>c</text></category></question>"
+                            "<question><name><text>Q1</text></name><broken></quiz>")
+    assert question_name(f) == "Q1"